@@ -6,11 +6,18 @@ from dotenv import load_dotenv
 from extensions import db, jwt
 from config import build_config
 from routes.auth_routes import auth_bp
-from routes.puzzle_routes import puzzle_bp
+from routes.puzzle_routes import puzzle_bp, produce_pool_puzzle
 from routes.usage_routes import usage_bp
 from routes.admin_routes import admin_bp
 
 from hooks.hooks import record_api_call
+from services.word_cache_service import WordCacheService
+from services.puzzle_pool_service import PuzzlePoolService
+from services.word_bank_service import WordBankService
+from services.quota_service import QuotaService
+from services.api_stats_service import ApiStatsRecorder
+from constants import DIFF_LEVELS
+from utils.single_flight import SingleFlight
 
 from flasgger import Swagger
 
@@ -74,8 +81,56 @@ def create_app() -> Flask:
         with app.app_context():
             db.create_all()
 
+    # Per-endpoint call counts, buffered in memory and flushed in batches
+    app.extensions['api_stats'] = ApiStatsRecorder(
+        flush_interval=app.config['API_STATS_FLUSH_SECONDS'],
+        flush_events=app.config['API_STATS_FLUSH_EVENTS'],
+    )
     app.after_request(record_api_call)
 
+    # Shared word-list cache for /generate-crossword
+    if app.config.get('WORD_CACHE_ENABLED'):
+        app.extensions['word_cache'] = WordCacheService(
+            ttl_seconds=app.config['WORD_CACHE_TTL_SECONDS'],
+            max_entries=app.config['WORD_CACHE_MAX_ENTRIES'],
+            use_db=app.config['WORD_CACHE_DB'],
+        )
+
+    # Local word bank: a word source of its own and a fallback for the LLM
+    if app.config.get('WORD_BANK_ENABLED'):
+        word_bank = WordBankService(app.config['WORD_BANK_PATH'])
+        try:
+            word_bank.ensure()
+            app.extensions['word_bank'] = word_bank
+        except Exception as e:
+            print(f"Word bank unavailable: {e}")
+
+    # Identical concurrent word-list prompts share one LLM call
+    app.extensions['word_flight'] = SingleFlight(
+        lock_dir=app.config['SINGLE_FLIGHT_LOCK_DIR'],
+        result_ttl=app.config['SINGLE_FLIGHT_RESULT_TTL_SECONDS'],
+        lock_timeout=app.config['SINGLE_FLIGHT_LOCK_TIMEOUT_SECONDS'],
+    )
+
+    # Daily free-limit checks for /generate-crossword
+    app.extensions['quota'] = QuotaService(ttl_seconds=app.config['QUOTA_SETTINGS_TTL_SECONDS'])
+
+    # Ready-made puzzles for popular topics, filled by background threads
+    if app.config.get('PUZZLE_POOL_ENABLED'):
+        pool = PuzzlePoolService(
+            app,
+            produce_pool_puzzle,
+            topics=app.config['PUZZLE_POOL_TOPICS'],
+            difficulties=list(DIFF_LEVELS),
+            size=app.config['PUZZLE_POOL_SIZE'],
+            low_watermark=app.config['PUZZLE_POOL_LOW_WATERMARK'],
+            workers=app.config['PUZZLE_POOL_WORKERS'],
+            promote_after=app.config['PUZZLE_POOL_PROMOTE_AFTER'],
+            max_pools=app.config['PUZZLE_POOL_MAX_POOLS'],
+        )
+        app.extensions['puzzle_pool'] = pool
+        pool.start()
+
     return app
 
 
@@ -0,0 +1,134 @@
+"""Benchmark CrosswordGenerator on the checked-in word lists.
+
+Every word list is solved ``--runs`` times, each run with its own seed
+derived from ``--seed``, so two invocations with the same arguments explore
+exactly the same search trees. Results are reported per difficulty.
+
+Usage (from backend/):
+    python benchmarks/bench_generator.py
+    python benchmarks/bench_generator.py --strategy ordered --runs 10 --levels hard
+    python benchmarks/bench_generator.py --json bench.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Allow running this file directly from repo root or backend/
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+from constants import DIFF_LEVELS  # noqa: E402
+from crossword_grid_generator import CrosswordGenerator  # noqa: E402
+
+WORDLISTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'wordlists.json')
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def load_wordlists(path=WORDLISTS):
+    with open(path, encoding='utf-8') as f:
+        wordlists = json.load(f)
+    for level, lists in wordlists.items():
+        expected = DIFF_LEVELS.get(level)
+        for topic, words in lists.items():
+            if expected is not None and len(words) != expected:
+                raise ValueError(f"{level}/{topic}: expected {expected} words, found {len(words)}")
+    return wordlists
+
+
+def run_level(lists, runs, seed, strategy, grid_size, time_limit, max_nodes, optimize):
+    """Solves every list ``runs`` times; returns one record per solve."""
+    records = []
+    for topic, words in sorted(lists.items()):
+        for i in range(runs):
+            random.seed(f"{seed}:{topic}:{i}")
+            generator = CrosswordGenerator(words, grid_size=grid_size, strategy=strategy)
+            started = time.perf_counter()
+            solved = generator.solve(time_limit=time_limit, max_nodes=max_nodes, optimize=optimize)
+            records.append({
+                'topic': topic,
+                'run': i,
+                'solved': solved,
+                'ms': (time.perf_counter() - started) * 1000,
+                'nodes': generator.stats['nodes'],
+                'backtracks': generator.stats['backtracks'],
+                'placed': len(generator.solution_coordinates),
+                'words': len(words),
+                'grid_size': generator.grid_size,
+            })
+    return records
+
+
+def summarize(records):
+    times = [r['ms'] for r in records]
+    nodes = [r['nodes'] for r in records]
+    backtracks = [r['backtracks'] for r in records]
+    return {
+        'solves': len(records),
+        'success_rate': sum(r['solved'] for r in records) / len(records),
+        'ms_p50': percentile(times, 50),
+        'ms_p95': percentile(times, 95),
+        'ms_p99': percentile(times, 99),
+        'nodes_p50': percentile(nodes, 50),
+        'nodes_p95': percentile(nodes, 95),
+        'nodes_p99': percentile(nodes, 99),
+        'backtracks_p50': percentile(backtracks, 50),
+        'backtracks_p95': percentile(backtracks, 95),
+        'backtracks_p99': percentile(backtracks, 99),
+        # Single-process throughput, for sizing worker counts
+        'solves_per_sec': len(records) / (sum(times) / 1000) if sum(times) else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--levels', nargs='+', default=list(DIFF_LEVELS), choices=list(DIFF_LEVELS))
+    parser.add_argument('--strategy', default='constrained', choices=CrosswordGenerator.STRATEGIES)
+    parser.add_argument('--runs', type=int, default=5, help='seeded solves per word list')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--grid-size', type=int, default=None, help='fixed board size (default: adaptive)')
+    parser.add_argument('--time-limit-ms', type=int, default=2000)
+    parser.add_argument('--max-nodes', type=int, default=50000)
+    parser.add_argument('--optimize', action='store_true')
+    parser.add_argument('--json', dest='json_path', help='also write the summary and every solve here')
+    args = parser.parse_args(argv)
+
+    wordlists = load_wordlists()
+    time_limit = args.time_limit_ms / 1000.0 if args.time_limit_ms else None
+    max_nodes = args.max_nodes or None
+
+    print(f"strategy={args.strategy} runs={args.runs} seed={args.seed} grid_size={args.grid_size or 'adaptive'} "
+          f"time_limit_ms={args.time_limit_ms} max_nodes={args.max_nodes} optimize={args.optimize}")
+    header = (f"{'level':<8}{'solves':>7}{'ok%':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+              f"{'p50 nodes':>11}{'p95 nodes':>11}{'p99 nodes':>11}{'p95 bt':>9}{'solves/s':>10}")
+    print(header)
+    print('-' * len(header))
+
+    report = {'args': vars(args), 'levels': {}}
+    for level in args.levels:
+        records = run_level(wordlists[level], args.runs, args.seed, args.strategy, args.grid_size,
+                            time_limit, max_nodes, args.optimize)
+        summary = summarize(records)
+        report['levels'][level] = {'summary': summary, 'solves': records}
+        print(f"{level:<8}{summary['solves']:>7}{summary['success_rate'] * 100:>7.1f}"
+              f"{summary['ms_p50']:>9.1f}{summary['ms_p95']:>9.1f}{summary['ms_p99']:>9.1f}"
+              f"{summary['nodes_p50']:>11}{summary['nodes_p95']:>11}{summary['nodes_p99']:>11}"
+              f"{summary['backtracks_p95']:>9}{summary['solves_per_sec']:>10.1f}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark the LLM response parsers on a corpus of recorded-style responses.
+
+``llm_responses.json`` holds word-list responses in the formats the model
+has been seen to produce (numbered, bold, plain, with chatter around the
+list, bullets, and JSON with and without a code fence). Each parser runs
+over every response ``--repeat`` times; the report shows its cost per
+response and how many of the expected words it recovered per format.
+
+Usage (from backend/):
+    python benchmarks/bench_parser.py
+    python benchmarks/bench_parser.py --repeat 500 --json parsers.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+# Allow running this file directly from repo root or backend/
+BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+from request import parse_word_json, parse_word_text  # noqa: E402
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'llm_responses.json')
+
+
+def parse_structured(body):
+    """What structured-output mode does: JSON first, the text parser as the fallback."""
+    parsed = parse_word_json(body)
+    return parsed if parsed is not None else parse_word_text(body)
+
+
+PARSERS = {
+    'text': parse_word_text,
+    'structured': parse_structured,
+}
+
+
+def run_parser(parse, corpus, repeat):
+    """Times ``parse`` over the corpus; returns per-style (microseconds per response, recall)."""
+    styles = {}
+    for entry in corpus:
+        body = entry['body']
+        started = time.perf_counter()
+        for _ in range(repeat):
+            parsed = parse(body)
+        us = (time.perf_counter() - started) * 1e6 / repeat
+        # Only count words that survive the route's cleaning of numbering and markup
+        words = {w.split('.', 1)[-1].strip().upper() for _, w, _ in parsed}
+        stats = styles.setdefault(entry['style'], {'responses': 0, 'us': 0.0, 'expected': 0, 'recovered': 0})
+        stats['responses'] += 1
+        stats['us'] += us
+        stats['expected'] += entry['words']
+        stats['recovered'] += min(entry['words'], len(words))
+    for stats in styles.values():
+        stats['us_per_response'] = stats.pop('us') / stats['responses']
+        stats['recall'] = stats['recovered'] / stats['expected'] if stats['expected'] else 0.0
+    return styles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--parsers', nargs='+', default=list(PARSERS), choices=list(PARSERS))
+    parser.add_argument('--repeat', type=int, default=200, help='parses of each response')
+    parser.add_argument('--json', dest='json_path', help='also write the results here')
+    args = parser.parse_args(argv)
+
+    with open(CORPUS, encoding='utf-8') as f:
+        corpus = json.load(f)
+
+    # The parsers print a summary line per call; keep it out of the timings
+    stdout, sys.stdout = sys.stdout, open(os.devnull, 'w')
+    try:
+        results = {name: run_parser(PARSERS[name], corpus, args.repeat) for name in args.parsers}
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+    print(f"corpus={len(corpus)} responses repeat={args.repeat}")
+    header = f"{'parser':<12}{'style':<14}{'us/resp':>10}{'recall%':>9}"
+    print(header)
+    print('-' * len(header))
+    for name, styles in results.items():
+        for style, stats in styles.items():
+            print(f"{name:<12}{style:<14}{stats['us_per_response']:>10.1f}{stats['recall'] * 100:>9.1f}")
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({'args': vars(args), 'parsers': results}, f, indent=2)
+        print(f"Wrote {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
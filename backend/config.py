@@ -2,6 +2,16 @@ import os
 import ssl
 from urllib.parse import urlparse, urlunparse, quote
 
+from crossword_grid_generator import CrosswordGenerator
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer from the environment, falling back to ``default``."""
+    try:
+        return int((os.getenv(name) or '').strip() or default)
+    except ValueError:
+        return default
+
 
 def build_config() -> dict:
     """Build Flask configuration from environment variables (and backend/.env loaded by app)."""
@@ -45,9 +55,16 @@ def build_config() -> dict:
     except Exception:
         pass
 
-    engine_options = { 'pool_pre_ping': True }
-    # Only apply SSL to MySQL connections
+    engine_options = { 'pool_pre_ping': (os.getenv('DB_POOL_PRE_PING') or 'true').strip().lower() == 'true' }
+    # Only apply pool sizing and SSL to MySQL connections
     if str(database_url).lower().startswith('mysql'):
+        engine_options.update({
+            'pool_size': _env_int('DB_POOL_SIZE', 5),
+            'max_overflow': _env_int('DB_MAX_OVERFLOW', 10),
+            'pool_timeout': _env_int('DB_POOL_TIMEOUT', 30),
+            # Recycle before the server (or a proxy) drops idle connections
+            'pool_recycle': _env_int('DB_POOL_RECYCLE', 280),
+        })
         ssl_mode = (os.getenv('DB_SSL_MODE') or '').strip().upper()
         insecure = (os.getenv('DB_SSL_INSECURE') or '').strip().lower() == 'true'
 
@@ -65,6 +82,74 @@ def build_config() -> dict:
 
     cfg['SQLALCHEMY_DATABASE_URI'] = database_url
     cfg['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+
+    # Optional read replica for read-only queries (usage summaries, saved-game
+    # listing, admin stats); same pool and TLS options as the primary
+    replica_url = (os.getenv('DATABASE_REPLICA_URL') or '').strip()
+    if replica_url:
+        cfg['SQLALCHEMY_BINDS'] = {'replica': {'url': replica_url, **engine_options}}
+    # After a failed replica connect, reads use the primary for this long
+    cfg['DB_REPLICA_RETRY_SECONDS'] = _env_int('DB_REPLICA_RETRY_SECONDS', 30)
     cfg['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+    # Crossword generator search: 'constrained' (default) or legacy 'ordered'
+    strategy = (os.getenv('CROSSWORD_STRATEGY') or 'constrained').strip().lower()
+    if strategy not in CrosswordGenerator.STRATEGIES:
+        print(f"Unknown CROSSWORD_STRATEGY {strategy!r}, using 'constrained'")
+        strategy = 'constrained'
+    cfg['CROSSWORD_STRATEGY'] = strategy
+    # Per-puzzle search budget; the best partial layout is served when it runs out
+    cfg['CROSSWORD_TIME_LIMIT_MS'] = _env_int('CROSSWORD_TIME_LIMIT_MS', 2000)
+    cfg['CROSSWORD_MAX_NODES'] = _env_int('CROSSWORD_MAX_NODES', 50000)
+    # Parallel seeded runs per puzzle in a process pool (0 or 1 solves in-process)
+    cfg['CROSSWORD_PORTFOLIO_WORKERS'] = _env_int('CROSSWORD_PORTFOLIO_WORKERS', 0)
+    # Spend the whole budget looking for the most compact layout
+    cfg['CROSSWORD_OPTIMIZE'] = (os.getenv('CROSSWORD_OPTIMIZE') or 'false').strip().lower() == 'true'
+    # Ask for this many percent more words than the puzzle needs; the best-fitting
+    # ones are used and the rest replace words the search could not place
+    cfg['CROSSWORD_SURPLUS_PERCENT'] = _env_int('CROSSWORD_SURPLUS_PERCENT', 50)
+    # Stream the LLM response and lay words out as they arrive; a full search
+    # only runs if some word found no crossing on the way
+    cfg['CROSSWORD_STREAMING'] = (os.getenv('CROSSWORD_STREAMING') or 'false').strip().lower() == 'true'
+
+    # Cache of LLM word lists per (topic, difficulty); each puzzle samples from it
+    cfg['WORD_CACHE_ENABLED'] = (os.getenv('WORD_CACHE_ENABLED') or 'true').strip().lower() == 'true'
+    cfg['WORD_CACHE_TTL_SECONDS'] = _env_int('WORD_CACHE_TTL_SECONDS', 86400)
+    cfg['WORD_CACHE_MAX_ENTRIES'] = _env_int('WORD_CACHE_MAX_ENTRIES', 256)
+    # Also keep word lists in the database so they survive restarts
+    cfg['WORD_CACHE_DB'] = (os.getenv('WORD_CACHE_DB') or 'false').strip().lower() == 'true'
+    # On a miss, ask the LLM for this many times the words a puzzle needs
+    cfg['WORD_CACHE_POOL_FACTOR'] = _env_int('WORD_CACHE_POOL_FACTOR', 2)
+
+    # Where puzzle words come from by default: 'llm' (Gemini) or 'local' (word bank)
+    cfg['WORD_SOURCE'] = (os.getenv('WORD_SOURCE') or 'llm').strip().lower()
+    # Local SQLite word bank, built from data/word_bank.json on first start
+    cfg['WORD_BANK_ENABLED'] = (os.getenv('WORD_BANK_ENABLED') or 'true').strip().lower() == 'true'
+    cfg['WORD_BANK_PATH'] = (os.getenv('WORD_BANK_PATH') or '').strip() or None
+    # Serve words from the bank when the LLM call fails or its circuit is open
+    cfg['WORD_BANK_FALLBACK'] = (os.getenv('WORD_BANK_FALLBACK') or 'true').strip().lower() == 'true'
+
+    # Identical concurrent LLM prompts share one call; with a lock directory the
+    # sharing extends to other worker processes on the same host
+    cfg['SINGLE_FLIGHT_LOCK_DIR'] = (os.getenv('SINGLE_FLIGHT_LOCK_DIR') or '').strip() or None
+    cfg['SINGLE_FLIGHT_RESULT_TTL_SECONDS'] = _env_int('SINGLE_FLIGHT_RESULT_TTL_SECONDS', 10)
+    cfg['SINGLE_FLIGHT_LOCK_TIMEOUT_SECONDS'] = _env_int('SINGLE_FLIGHT_LOCK_TIMEOUT_SECONDS', 60)
+
+    # API call statistics are written every N seconds or M calls, whichever comes first
+    cfg['API_STATS_FLUSH_SECONDS'] = _env_int('API_STATS_FLUSH_SECONDS', 5)
+    cfg['API_STATS_FLUSH_EVENTS'] = _env_int('API_STATS_FLUSH_EVENTS', 500)
+
+    # How long each worker trusts its cached DAILY_FREE_LIMIT setting
+    cfg['QUOTA_SETTINGS_TTL_SECONDS'] = _env_int('QUOTA_SETTINGS_TTL_SECONDS', 30)
+
+    # Pre-generated puzzles for popular topics, refilled by background threads
+    cfg['PUZZLE_POOL_ENABLED'] = (os.getenv('PUZZLE_POOL_ENABLED') or 'false').strip().lower() == 'true'
+    cfg['PUZZLE_POOL_TOPICS'] = [t.strip() for t in (os.getenv('PUZZLE_POOL_TOPICS') or 'JavaScript').split(',') if t.strip()]
+    cfg['PUZZLE_POOL_SIZE'] = _env_int('PUZZLE_POOL_SIZE', 5)
+    cfg['PUZZLE_POOL_LOW_WATERMARK'] = _env_int('PUZZLE_POOL_LOW_WATERMARK', 2)
+    cfg['PUZZLE_POOL_WORKERS'] = _env_int('PUZZLE_POOL_WORKERS', 1)
+    # Other (topic, difficulty) pairs get a pool after this many requests
+    cfg['PUZZLE_POOL_PROMOTE_AFTER'] = _env_int('PUZZLE_POOL_PROMOTE_AFTER', 3)
+    cfg['PUZZLE_POOL_MAX_POOLS'] = _env_int('PUZZLE_POOL_MAX_POOLS', 64)
+
     return cfg
@@ -1,2 +1,9 @@
 DEFAULT_DAILY_FREE_LIMIT = 20
 DEFAULT_FREE_CALLS_LIMIT = 20  # deprecated; use DEFAULT_DAILY_FREE_LIMIT instead
+
+# Words requested from the LLM per puzzle difficulty
+DIFF_LEVELS = {
+    'easy': 10,
+    'medium': 15,
+    'hard': 20
+}
@@ -1,51 +1,547 @@
-import copy
+import math
 import random
-from request import request
+import time
+from array import array
+from collections import Counter
+
+
+class _SearchBudgetExhausted(Exception):
+    """Raised inside the search when the time or node budget runs out."""
+
+
+class FlatGrid:
+    """Crossword board stored as a flat bytearray with row/column occupancy bitmasks.
+
+    Each cell holds a small letter code (0 means empty). Bit ``c`` of
+    ``row_masks[r]`` (and bit ``r`` of ``col_masks[c]``) is set when the cell
+    at (r, c) is occupied, so placement legality checks reduce to a few
+    integer mask operations instead of walking nested lists.
+
+    Every cell ``place`` fills is appended to ``undo``; a placement is
+    undone by clearing the cells logged after the mark ``place`` returned.
+    """
+
+    __slots__ = ('size', 'cells', 'row_masks', 'col_masks', 'undo', 'clipped', '_codes', '_chars')
+
+    def __init__(self, size):
+        self.size = size
+        self.cells = bytearray(size * size)
+        self.row_masks = [0] * size
+        self.col_masks = [0] * size
+        self.undo = array('I')
+        # Set once a placement is turned down only for running off the board
+        self.clipped = False
+        self._codes = {}
+        self._chars = ['']
+
+    def encode(self, word):
+        """Translate a word into the per-grid letter codes stored in ``cells``."""
+        codes = []
+        for char in word:
+            code = self._codes.get(char)
+            if code is None:
+                code = len(self._chars)
+                if code > 255:
+                    raise ValueError('Too many distinct letters for the grid alphabet')
+                self._codes[char] = code
+                self._chars.append(char)
+            codes.append(code)
+        return bytes(codes)
+
+    def resized(self, size):
+        """An empty grid of another size sharing this grid's letter codes."""
+        grid = FlatGrid(size)
+        grid._codes = self._codes
+        grid._chars = self._chars
+        return grid
+
+    def clone(self):
+        """An independent copy of the board and its undo log."""
+        grid = FlatGrid.__new__(FlatGrid)
+        grid.size = self.size
+        grid.cells = bytearray(self.cells)
+        grid.row_masks = list(self.row_masks)
+        grid.col_masks = list(self.col_masks)
+        grid.undo = array('I', self.undo)
+        grid.clipped = self.clipped
+        grid._codes = self._codes
+        grid._chars = self._chars
+        return grid
+
+    def char_at(self, r, c):
+        return self._chars[self.cells[r * self.size + c]]
+
+    def can_place(self, codes, c, r, horizontal):
+        """Checks if an encoded word can be legally placed at a given location."""
+        size = self.size
+        n = len(codes)
+        if r < 0 or c < 0:
+            self.clipped = True
+            return False
+
+        if horizontal:
+            if c + n > size or r >= size:
+                self.clipped = True
+                return False
+            line = self.row_masks[r]
+            span = ((1 << n) - 1) << c
+            # The cells just before and after the word must be empty
+            if line & ((span << 1) | (span >> 1)) & ~span:
+                return False
+            # Empty cells of the word may not touch letters above or below
+            beside = (self.row_masks[r - 1] if r > 0 else 0) | (self.row_masks[r + 1] if r + 1 < size else 0)
+            if beside & span & ~line:
+                return False
+            base = r * size
+            offset = c
+        else:
+            if r + n > size or c >= size:
+                self.clipped = True
+                return False
+            line = self.col_masks[c]
+            span = ((1 << n) - 1) << r
+            if line & ((span << 1) | (span >> 1)) & ~span:
+                return False
+            beside = (self.col_masks[c - 1] if c > 0 else 0) | (self.col_masks[c + 1] if c + 1 < size else 0)
+            if beside & span & ~line:
+                return False
+            base = c
+            offset = r
+
+        # Occupied cells inside the span must already hold the matching letter
+        hits = line & span
+        cells = self.cells
+        stride = 1 if horizontal else size
+        while hits:
+            low = hits & -hits
+            pos = low.bit_length() - 1
+            if cells[base + pos * stride] != codes[pos - offset]:
+                return False
+            hits ^= low
+        return True
+
+    def place(self, codes, c, r, horizontal):
+        """Writes an encoded word; returns the undo mark to revert to, or None if off the board."""
+        size = self.size
+        n = len(codes)
+        if r < 0 or c < 0 or (c + n > size or r >= size if horizontal else r + n > size or c >= size):
+            return None
+        cells = self.cells
+        row_masks = self.row_masks
+        col_masks = self.col_masks
+        undo = self.undo
+        mark = len(undo)
+        idx = r * size + c
+        step = 1 if horizontal else size
+        for code in codes:
+            if not cells[idx]:
+                cells[idx] = code
+                cur_r, cur_c = divmod(idx, size)
+                row_masks[cur_r] |= 1 << cur_c
+                col_masks[cur_c] |= 1 << cur_r
+                undo.append(idx)
+            idx += step
+        return mark
+
+    def revert(self, mark):
+        """Clears every cell filled since ``place`` returned ``mark``."""
+        size = self.size
+        undo = self.undo
+        for idx in undo[mark:]:
+            r, c = divmod(idx, size)
+            self.cells[idx] = 0
+            self.row_masks[r] &= ~(1 << c)
+            self.col_masks[c] &= ~(1 << r)
+        del undo[mark:]
+
+    def occupied(self):
+        """Yields (row, col) for every occupied cell, in row-major order."""
+        for r, mask in enumerate(self.row_masks):
+            while mask:
+                low = mask & -mask
+                yield r, low.bit_length() - 1
+                mask ^= low
+
+    def to_rows(self):
+        """Returns the board as a list of rows of one-character strings ('' when empty)."""
+        chars = self._chars
+        size = self.size
+        cells = self.cells
+        return [[chars[code] for code in cells[r * size:(r + 1) * size]] for r in range(size)]
+
+
+class GridState:
+    """A board together with the stack of placements that produced it.
+
+    Placements are kept as parallel arrays (word index, column, row, across
+    flag and the board's undo mark from before the word went down), so the
+    state is a handful of flat buffers: ``clone()`` copies them and pickling
+    ships them as they are.
+    """
+
+    __slots__ = ('words', 'board', 'word_ids', 'cols', 'rows', 'across', 'marks', 'crossings')
+
+    def __init__(self, words, board):
+        self.words = tuple(words)
+        self.board = board
+        self.word_ids = array('H')
+        self.cols = array('h')
+        self.rows = array('h')
+        self.across = array('b')
+        self.marks = array('I')
+        self.crossings = 0
+
+    def __len__(self):
+        return len(self.marks)
+
+    def push(self, word_id, codes, c, r, horizontal):
+        """Places a word; returns the board's undo mark, or None if it runs off the board."""
+        mark = self.board.place(codes, c, r, horizontal)
+        if mark is None:
+            return None
+        self.word_ids.append(word_id)
+        self.cols.append(c)
+        self.rows.append(r)
+        self.across.append(horizontal)
+        self.marks.append(mark)
+        self.crossings += len(codes) - (len(self.board.undo) - mark)
+        return mark
+
+    def pop(self):
+        """Undoes the most recent placement and returns its (word_id, col, row, horizontal)."""
+        mark = self.marks.pop()
+        word_id = self.word_ids.pop()
+        self.crossings -= len(self.words[word_id]) - (len(self.board.undo) - mark)
+        self.board.revert(mark)
+        return word_id, self.cols.pop(), self.rows.pop(), bool(self.across.pop())
+
+    def placements(self):
+        """The placements as (word, col, row, 'H'/'V') tuples, oldest first."""
+        words = self.words
+        return [(words[w], c, r, 'H' if a else 'V')
+                for w, c, r, a in zip(self.word_ids, self.cols, self.rows, self.across)]
+
+    def clone(self):
+        """An independent copy that can be searched from or undone separately."""
+        state = GridState.__new__(GridState)
+        state.words = self.words
+        state.board = self.board.clone()
+        state.word_ids = array('H', self.word_ids)
+        state.cols = array('h', self.cols)
+        state.rows = array('h', self.rows)
+        state.across = array('b', self.across)
+        state.marks = array('I', self.marks)
+        state.crossings = self.crossings
+        return state
+
 
 class CrosswordGenerator:
-    def __init__(self, words, grid_size=30):
-        # Sort words from longest to shortest for higher success rate
-        self.words = sorted(words, key=len, reverse=True)
+    # 'ordered' places words longest-first with chronological backtracking;
+    # 'constrained' picks the most constrained word next, forward checks the
+    # remaining words and backjumps to the placement behind a conflict.
+    STRATEGIES = ('ordered', 'constrained')
+
+    # Adaptive sizing: side lengths to try, and the node cap for each attempt
+    # short of the largest board.
+    MIN_GRID_SIZE = 7
+    MAX_GRID_SIZE = 30
+    CELLS_PER_LETTER = 4
+    GRID_GROWTH_MIN = 4
+    ATTEMPT_MAX_NODES = 2000
+
+    def __init__(self, words, grid_size=None, strategy='ordered'):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown search strategy: {strategy}")
+        # Sort words from longest to shortest for higher success rate. Repeats are
+        # dropped: word ids index self.words, so each word may appear only once.
+        self.words = sorted(dict.fromkeys(words), key=len, reverse=True)
+        # Without a fixed size the board starts tight and grows when the search fails
+        self.adaptive = grid_size is None
+        if self.adaptive:
+            grid_size = self.initial_grid_size(self.words)
+        self.grid_size = grid_size
+        self.strategy = strategy
+        self.board = FlatGrid(grid_size)
+        self._encoded = {}
+        self._word_ids = {}
+        # letter code -> positions of that letter in the word, per word
+        self._letter_positions = {}
+        # word -> the other words it shares at least one letter with
+        self._partners = {}
+        for word in self.words:
+            self._register(word)
+        self._deadline = None
+        self._max_nodes = None
+        # The caller's (deadline, max_nodes) while adaptive attempts run on a share of it
+        self._budget = None
+        self._stop_event = None
+        # Optimisation mode: best complete layout by (bounding-box area, -crossings)
+        self._optimize = False
+        # Words given to add_word that found no legal spot yet
+        self._deferred = []
+        self.solved = False
+        self.stats = {'nodes': 0, 'backtracks': 0, 'elapsed_ms': 0, 'budget_exhausted': False,
+                      'grid_sizes': []}
+        self._reset(grid_size)
+
+    def _register(self, word):
+        """Indexes a word's letter codes and positions and links it to its crossing partners."""
+        if word in self._encoded:
+            return
+        codes = self._encoded[word] = self.board.encode(word)
+        self._word_ids[word] = len(self._word_ids)
+        positions = {}
+        for i, code in enumerate(codes):
+            positions.setdefault(code, []).append(i)
+        partners = set()
+        for other, other_positions in self._letter_positions.items():
+            if not positions.keys().isdisjoint(other_positions.keys()):
+                partners.add(other)
+                self._partners[other].add(word)
+        self._letter_positions[word] = positions
+        self._partners[word] = partners
+
+    def _reset(self, grid_size):
+        """Clears the board and every per-layout structure, resizing the board."""
         self.grid_size = grid_size
-        self.grid = [['' for _ in range(grid_size)] for _ in range(grid_size)]
-        self.solution_coordinates = []
+        self.board = self.board.resized(grid_size)
+        self.state = GridState(self.words, self.board)
+        # letter code -> set of (row, col) of occupied cells holding that letter
+        self._letter_cells = {}
+        # per cell: bitmask of the placement depths whose word covers the cell
+        self._cell_owners = [0] * (grid_size * grid_size)
+        # Best layout seen so far, scored by (words placed, crossings)
+        self._best = []
+        self._best_score = (0, 0)
+        self._best_complete = None
+        self._best_complete_cost = None
+
+    @classmethod
+    def initial_grid_size(cls, words):
+        """Starting side length for adaptive sizing, from the word count and total letters.
+
+        Blank cells between words take up room as well, so the board gets
+        about ``CELLS_PER_LETTER`` cells per letter, and never less than the
+        longest word plus a little slack.
+        """
+        if not words:
+            return cls.MIN_GRID_SIZE
+        letters = sum(len(w) for w in words)
+        side = math.isqrt(letters * cls.CELLS_PER_LETTER - 1) + 1
+        side = max(side, max(len(w) for w in words) + 2, cls.MIN_GRID_SIZE)
+        return min(side, cls.MAX_GRID_SIZE)
+
+    @classmethod
+    def grid_sizes(cls, words):
+        """The sizes adaptive solving tries, tightest first, ending at ``MAX_GRID_SIZE``."""
+        size = cls.initial_grid_size(words)
+        sizes = [size]
+        while size < cls.MAX_GRID_SIZE:
+            size = min(cls.MAX_GRID_SIZE, size + max(cls.GRID_GROWTH_MIN, size // 4))
+            sizes.append(size)
+        return sizes
+
+    @classmethod
+    def select_words(cls, words, count):
+        """Picks ``count`` of the candidate ``words`` that should interlock well.
+
+        A word's crossing potential counts, for each distinct letter in it, the
+        other candidates that share the letter, so common letters score high
+        and words sharing no letter with any other candidate score zero.
+        Words are taken best first, each pick's score divided by one plus the
+        picks of the same length so far, which keeps a mix of lengths.
+        Order follows the input.
+        """
+        unique = list(dict.fromkeys(w for w in words if len(w) <= cls.MAX_GRID_SIZE))
+        if len(unique) <= count:
+            return unique
+        letter_words = Counter(ch for w in unique for ch in set(w))
+        potential = {w: sum(letter_words[ch] - 1 for ch in set(w)) for w in unique}
+        picked = set()
+        picked_lengths = Counter()
+        remaining = list(unique)
+        while len(picked) < count:
+            best = max(remaining, key=lambda w: (potential[w] / (1 + picked_lengths[len(w)]), len(w)))
+            remaining.remove(best)
+            picked.add(best)
+            picked_lengths[len(best)] += 1
+        return [w for w in unique if w in picked]
+
+    @property
+    def grid(self):
+        """The board as a ``grid_size`` x ``grid_size`` list of one-character strings."""
+        return self.board.to_rows()
+
+    @property
+    def solution_coordinates(self):
+        """The current layout as a list of (word, col, row, 'H'/'V') placements."""
+        return self.state.placements()
+
+    @property
+    def score(self):
+        """(words placed, crossings) of the best layout found so far."""
+        return self._best_score
+
+    @property
+    def cost(self):
+        """(bounding-box area, -crossings) of the current layout; lower is better."""
+        return self._bbox_area(), -self.state.crossings
+
+    def solve(self, time_limit=None, max_nodes=None, stop_event=None, optimize=False):
+        """Public method to start the solving process.
+
+        ``time_limit`` (seconds) and ``max_nodes`` (placements tried) bound the
+        search, and setting ``stop_event`` (anything with ``is_set()``) ends it
+        early. If the search stops, or the words cannot all be placed, False is
+        returned and the grid holds the best partial layout found: the most
+        words, then the most crossings.
 
-    def solve(self):
-        """Public method to start the solving process."""
+        With ``optimize`` the search keeps going after the first full layout,
+        pruning branches that cannot beat the best one's ``cost``, and returns
+        the most compact layout found once the budget runs out. Give it a
+        budget: without one it enumerates every layout.
+        """
+        self._deadline = time.monotonic() + time_limit if time_limit is not None else None
+        self._max_nodes = max_nodes
+        self._stop_event = stop_event
+        self._optimize = optimize
+        started = time.perf_counter()
+        try:
+            self.solved = self._solve()
+            return self.solved
+        finally:
+            self.stats['elapsed_ms'] = int((time.perf_counter() - started) * 1000)
+
+    def _solve(self):
         # Check if we have any words to place
         if not self.words or len(self.words) == 0:
             return False
-        
-        # The first word is placed specially to anchor the puzzle
-        first_word = self.words[0]
-        
-        # Ensure the first word fits in the grid
-        if len(first_word) > self.grid_size:
-            return False
-        
-        # Place horizontally near the center
-        start_row = self.grid_size // 2
-        start_col = (self.grid_size - len(first_word)) // 2
-        
-        # Ensure coordinates are valid
-        if start_col < 0 or start_col + len(first_word) > self.grid_size:
-            return False
-        if start_row < 0 or start_row >= self.grid_size:
-            return False
-        
-        # Place the first word
-        for i, char in enumerate(first_word):
-            self.grid[start_row][start_col + i] = char
-        
-        self.solution_coordinates.append((first_word, start_col, start_row, 'H'))
-        
+        if not self.adaptive:
+            self.stats['grid_sizes'].append(self.grid_size)
+            solved = self._attempt()
+            self.stats['budget_exhausted'] = self._exhausted
+            return solved
+
+        deadline, max_nodes = self._budget = self._deadline, self._max_nodes
+        sizes = self.grid_sizes(self.words)
+        seed = None
+        for i, size in enumerate(sizes):
+            self._share_budget(deadline, max_nodes, len(sizes) - i)
+            self._reset(size)
+            self.stats['grid_sizes'].append(size)
+            if self._attempt(seed):
+                self.stats['budget_exhausted'] = self._exhausted
+                return True
+            if seed is not None and (i == len(sizes) - 1 or not (self._exhausted or self.board.clipped)):
+                # The layout carried over from the smaller board was a dead end,
+                # or this is the last board: start afresh and keep the better one.
+                carried = self._best_score, self.solution_coordinates
+                self._reset(size)
+                if self._attempt():
+                    self.stats['budget_exhausted'] = self._exhausted
+                    return True
+                if carried[0] > self._best_score:
+                    self.load_layout(carried[1])
+            if self._out_of_budget(deadline, max_nodes):
+                self.stats['budget_exhausted'] = True
+                break
+            if not (self._exhausted or self.board.clipped):
+                # The search never ran into the edge of the board, so a larger
+                # board would fail the same way.
+                break
+            if i + 1 < len(sizes):
+                # Carry the best partial layout over, centred on the larger board
+                shift = (sizes[i + 1] - size) // 2
+                seed = [(word, c + shift, r + shift, direction)
+                        for word, c, r, direction in self.solution_coordinates]
+        return False
+
+    def _attempt(self, seed=None):
+        """One search on the current board, optionally continuing from ``seed`` placements.
+
+        Sets ``_exhausted`` if the budget ran out. On failure the board holds
+        the best partial layout found.
+        """
+        self._exhausted = False
+        if seed:
+            remaining = list(self.words)
+            for placement in seed:
+                self._push(*placement)
+                remaining.remove(placement[0])
+        else:
+            # The first word is placed specially to anchor the puzzle
+            first_word = self.words[0]
+
+            # Ensure the first word fits in the grid
+            if len(first_word) > self.grid_size:
+                return False
+
+            # Place horizontally near the center
+            start_row = self.grid_size // 2
+            start_col = (self.grid_size - len(first_word)) // 2
+
+            # Ensure coordinates are valid
+            if start_col < 0 or start_col + len(first_word) > self.grid_size:
+                return False
+            if start_row < 0 or start_row >= self.grid_size:
+                return False
+
+            # Place the first word
+            self._push(first_word, start_col, start_row, 'H')
+            remaining = self.words[1:]
+
         # Recursively try to place the rest of the words
-        return self._solve_recursive(self.words[1:])
+        try:
+            if self.strategy == 'constrained':
+                # Words sharing no letter with any other word can never cross one;
+                # leave them out so the best layout still covers everything else.
+                placeable = [w for w in remaining if self._partners[w]]
+                if len(placeable) < len(remaining):
+                    self._optimize = False
+                solved, _ = self._solve_constrained(placeable)
+                solved = solved and len(placeable) == len(remaining)
+            else:
+                solved = self._solve_recursive(remaining)
+        except _SearchBudgetExhausted:
+            self._exhausted = True
+            solved = False
+
+        if self._best_complete is not None:
+            self.load_layout(self._best_complete)
+            return True
+        if not solved:
+            self._restore_best()
+        return solved
+
+    def _share_budget(self, deadline, max_nodes, attempts_left):
+        """Gives the next adaptive attempt an even share of what is left of the budget."""
+        if deadline is not None:
+            now = time.monotonic()
+            self._deadline = now + max(0.0, deadline - now) / attempts_left
+        nodes = self.stats['nodes']
+        share = max(0, max_nodes - nodes) // attempts_left if max_nodes is not None else None
+        if attempts_left > 1:
+            # A tight board that needs a long search is better abandoned for a larger one
+            share = self.ATTEMPT_MAX_NODES if share is None else min(share, self.ATTEMPT_MAX_NODES)
+        self._max_nodes = nodes + share if share is not None else None
+
+    def _out_of_budget(self, deadline, max_nodes):
+        """Whether the caller's overall budget is spent or a stop was requested."""
+        if deadline is not None and time.monotonic() >= deadline:
+            return True
+        if max_nodes is not None and self.stats['nodes'] >= max_nodes:
+            return True
+        return self._stop_event is not None and self._stop_event.is_set()
 
     def _solve_recursive(self, words_to_place):
         """The core backtracking function."""
         if not words_to_place:
+            if self._optimize:
+                self._record_complete()
+                return False
             return True # Base case: All words placed
+        if self._optimize and not self._can_improve(words_to_place):
+            return False
 
         word = words_to_place[0]
         remaining_words = words_to_place[1:]
@@ -56,127 +552,353 @@ class CrosswordGenerator:
 
         for col, row, direction in placements:
             # 1. Choose: Place the word by making a snapshot
-            snapshot = self._place_word(word, col, row, direction)
-            if snapshot is None:
+            self._charge_node()
+            if not self._push(word, col, row, direction):
                 # Placement failed due to bounds error, try next placement
                 continue
-            
-            self.solution_coordinates.append((word, col, row, direction))
 
             # 2. Explore: Recurse with the new state
             if self._solve_recursive(remaining_words):
                 return True
 
             # 3. Backtrack: If recursion failed, undo the choice
-            self._revert_placement(snapshot)
-            self.solution_coordinates.pop()
+            self._pop()
 
         return False
 
+    def _solve_constrained(self, words_to_place):
+        """Backtracking with dynamic word ordering, forward checking and backjumping.
+
+        A word gains placements as other words are laid down, except once every
+        word it shares a letter with is already placed: from then on its
+        placements can only shrink. Among such closed words the one with the
+        fewest placements goes next and a closed word with none ends the
+        branch; otherwise the longest word that can be placed goes next.
+
+        Returns ``(solved, conflict)``. On failure ``conflict`` is a bitmask of
+        the placement depths responsible: while those placements stand the
+        branch cannot succeed, so shallower placements outside the mask are
+        skipped. An empty mask means no rearrangement can help.
+        """
+        if not words_to_place:
+            if self._optimize:
+                # Keep looking for a more compact layout
+                self._record_complete()
+                return False, (1 << len(self.state)) - 1
+            return True, 0
+        if self._optimize and not self._can_improve(words_to_place):
+            return False, (1 << len(self.state)) - 1
+
+        unplaced = set(words_to_place)
+        word, placements = None, None
+        for candidate in words_to_place:
+            if not self._partners[candidate].isdisjoint(unplaced):
+                continue
+            candidate_placements = self._find_possible_placements(candidate)
+            if not candidate_placements:
+                # Forward check: this word can no longer fit anywhere
+                return False, self._conflict_mask(candidate)
+            if placements is None or len(candidate_placements) < len(placements):
+                word, placements = candidate, candidate_placements
+
+        if word is None:
+            for candidate in words_to_place:
+                placements = self._find_possible_placements(candidate)
+                if placements:
+                    word = candidate
+                    break
+            else:
+                # Nothing can be placed now, so nothing can be placed later either
+                conflict = 0
+                for candidate in words_to_place:
+                    conflict |= self._conflict_mask(candidate)
+                return False, conflict
+
+        idx = words_to_place.index(word)
+        remaining_words = words_to_place[:idx] + words_to_place[idx + 1:]
+        random.shuffle(placements)
+
+        bit = 1 << len(self.state)
+        for col, row, direction in placements:
+            self._charge_node()
+            if not self._push(word, col, row, direction):
+                continue
+
+            solved, child_conflict = self._solve_constrained(remaining_words)
+            if solved:
+                return True, 0
+
+            self._pop()
+
+            if not child_conflict & bit:
+                # Moving this word cannot fix the failure below: jump back past it
+                return False, child_conflict
+
+        # Which word got picked here depended on every earlier placement, so an
+        # exhausted word only licenses a chronological step back.
+        return False, bit - 1
+
+    def _push(self, word, c, r, direction):
+        """Places a word and records it in the solution; returns False if it does not fit."""
+        state = self.state
+        mark = state.push(self._word_ids[word], self._encoded[word], c, r, direction == 'H')
+        if mark is None:
+            return False
+        # Index the newly filled cells by letter
+        board = self.board
+        cells = board.cells
+        size = self.grid_size
+        letter_cells = self._letter_cells
+        for idx in board.undo[mark:]:
+            letter_cells.setdefault(cells[idx], set()).add(divmod(idx, size))
+        self._mark_owner(word, c, r, direction, 1 << (len(state) - 1))
+        score = (len(state), state.crossings)
+        if score > self._best_score:
+            self._best_score = score
+            self._best = state.placements()
+        return True
+
+    def _pop(self):
+        """Undoes the most recent ``_push``."""
+        state = self.state
+        board = self.board
+        cells = board.cells
+        size = self.grid_size
+        letter_cells = self._letter_cells
+        for idx in board.undo[state.marks[-1]:]:
+            letter_cells[cells[idx]].discard(divmod(idx, size))
+        word_id, c, r, horizontal = state.pop()
+        self._mark_owner(self.words[word_id], c, r, 'H' if horizontal else 'V', 1 << len(state))
+        self.stats['backtracks'] += 1
+
+    def _charge_node(self):
+        """Counts one placement attempt against the search budget."""
+        self.stats['nodes'] += 1
+        if self._max_nodes is not None and self.stats['nodes'] > self._max_nodes:
+            raise _SearchBudgetExhausted()
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            raise _SearchBudgetExhausted()
+        # The event may live in another process, so only poll it now and then
+        if self._stop_event is not None and self.stats['nodes'] % 256 == 0 and self._stop_event.is_set():
+            raise _SearchBudgetExhausted()
+
+    def add_word(self, word):
+        """Adds one more word and places it greedily on the current layout, without search.
+
+        For words that arrive one at a time (e.g. streamed from the LLM): the
+        first word is centred across the board, each later one goes where it
+        crosses the most letters, nearest the centre on ties. A word with no
+        legal spot yet is retried whenever another word is placed. Returns
+        whether the word was placed; the layout is never rearranged to make room.
+        """
+        if word not in self._encoded:
+            self.words.append(word)
+            self._register(word)
+            self.state.words = tuple(self.words)
+        elif self._word_ids[word] in self.state.word_ids:
+            return True
+        if not self._place_greedily(word):
+            if word not in self._deferred:
+                self._deferred.append(word)
+            return False
+        placed = True
+        while placed:
+            placed = False
+            for other in self._deferred:
+                if self._place_greedily(other):
+                    self._deferred.remove(other)
+                    placed = True
+                    break
+        return True
+
+    def _place_greedily(self, word):
+        size = self.grid_size
+        length = len(word)
+        if not self.state:
+            if length > size:
+                return False
+            return self._push(word, (size - length) // 2, size // 2, 'H')
+
+        placements = self._find_possible_placements(word)
+        if not placements:
+            return False
+        board = self.board
+        span = (1 << length) - 1
+        centre = (size - 1) / 2
+
+        def rank(placement):
+            c, r, direction = placement
+            if direction == 'H':
+                crossings = bin((board.row_masks[r] >> c) & span).count('1')
+                offset = abs(c + (length - 1) / 2 - centre) + abs(r - centre)
+            else:
+                crossings = bin((board.col_masks[c] >> r) & span).count('1')
+                offset = abs(r + (length - 1) / 2 - centre) + abs(c - centre)
+            return -crossings, offset
+
+        return self._push(word, *min(placements, key=rank))
+
+    def compact(self):
+        """Moves the layout, centred, onto the smallest adaptive board size that holds it."""
+        box = self.bounding_box()
+        if box is None:
+            return
+        top, left, bottom, right = box
+        height, width = bottom - top + 1, right - left + 1
+        size = next((s for s in self.grid_sizes(self.words) if s >= max(height, width)), self.grid_size)
+        if size >= self.grid_size:
+            return
+        dr = (size - height) // 2 - top
+        dc = (size - width) // 2 - left
+        placements = [(word, c + dc, r + dr, direction) for word, c, r, direction in self.solution_coordinates]
+        self._reset(size)
+        self.load_layout(placements)
+
+    def load_layout(self, placements):
+        """Lays out (word, col, row, direction) placements found by another solver run."""
+        while self.state:
+            self._pop()
+        for word, c, r, direction in placements:
+            if not self._push(word, c, r, direction):
+                raise ValueError(f"Placement does not fit the grid: {word}")
+
+    def _restore_best(self):
+        """Rebuilds the grid from the best layout recorded during the search."""
+        best = self._best
+        backtracks = self.stats['backtracks']
+        while self.state:
+            self._pop()
+        self.stats['backtracks'] = backtracks
+        for word, c, r, direction in best:
+            self._push(word, c, r, direction)
+
+    def bounding_box(self):
+        """(top, left, bottom, right) inclusive bounds of the occupied cells, or None."""
+        rows = cols = 0
+        for mask in self.board.row_masks:
+            cols |= mask
+        for mask in self.board.col_masks:
+            rows |= mask
+        if not rows:
+            return None
+        return ((rows & -rows).bit_length() - 1, (cols & -cols).bit_length() - 1,
+                rows.bit_length() - 1, cols.bit_length() - 1)
+
+    def _bbox_area(self):
+        """Area of the bounding box around all occupied cells."""
+        box = self.bounding_box()
+        if box is None:
+            return 0
+        top, left, bottom, right = box
+        return (bottom - top + 1) * (right - left + 1)
+
+    def _record_complete(self):
+        """Keeps the current full layout if it is the most compact one so far."""
+        cost = self.cost
+        if self._best_complete_cost is None or cost < self._best_complete_cost:
+            if self._best_complete_cost is None and self._budget is not None:
+                # Every word fits this board, so it gets the rest of the budget
+                self._deadline, self._max_nodes = self._budget
+            self._best_complete_cost = cost
+            self._best_complete = self.state.placements()
+
+    def _can_improve(self, words_to_place):
+        """Branch-and-bound test: can any completion of this branch beat the best layout?
+
+        The bounding box only grows as words are added, and each remaining
+        word adds at most one crossing per letter.
+        """
+        if self._best_complete_cost is None:
+            return True
+        best_area, best_crossings = self._best_complete_cost
+        area = self._bbox_area()
+        if area != best_area:
+            return area < best_area
+        return -(self.state.crossings + sum(len(w) for w in words_to_place)) < best_crossings
+
+    def _mark_owner(self, word, c, r, direction, bit):
+        """Toggles ``bit`` in the owner mask of every cell covered by a placed word."""
+        step = 1 if direction == 'H' else self.grid_size
+        start = r * self.grid_size + c
+        owners = self._cell_owners
+        for k in range(len(word)):
+            owners[start + k * step] ^= bit
+
+    def _conflict_mask(self, word):
+        """Bitmask of placement depths that determine where ``word`` could go.
+
+        Includes the owners of every cell that could anchor the word and of
+        every cell in or around the spans those anchors would give it, which
+        together explain why none of those spans is legal.
+        """
+        size = self.grid_size
+        owners = self._cell_owners
+        length = len(word)
+        mask = 0
+        for code, offsets in self._letter_positions[word].items():
+            for r_idx, c_idx in self._letter_cells.get(code, ()):
+                mask |= owners[r_idx * size + c_idx]
+                for i in offsets:
+                    for horizontal in (True, False):
+                        r0, c0 = (r_idx, c_idx - i) if horizontal else (r_idx - i, c_idx)
+                        for k in range(-1, length + 1):
+                            r1, c1 = (r0, c0 + k) if horizontal else (r0 + k, c0)
+                            for dr, dc in ((0, 0), (-1, 0), (1, 0)) if horizontal else ((0, 0), (0, -1), (0, 1)):
+                                rr, cc = r1 + dr, c1 + dc
+                                if 0 <= rr < size and 0 <= cc < size:
+                                    mask |= owners[rr * size + cc]
+        return mask
+
     def _find_possible_placements(self, word):
-        """Finds all valid (col, row, direction) for a given word by finding intersections."""
+        """Finds all valid (col, row, direction) for a given word by finding intersections.
+
+        Only cells holding one of the word's letters are visited, via the
+        letter index kept up to date by ``_push``/``_pop``.
+        """
         placements = []
-        for r_idx in range(self.grid_size):
-            for c_idx in range(self.grid_size):
-                # Check for potential intersections with existing letters
-                if self.grid[r_idx][c_idx] != '':
-                    for i, letter in enumerate(word):
-                        if letter == self.grid[r_idx][c_idx]:
-                            # Try placing horizontally
-                            start_col, start_row = c_idx - i, r_idx
-                            if self._can_place(word, start_col, start_row, 'H'):
-                                placements.append((start_col, start_row, 'H'))
-                            
-                            # Try placing vertically
-                            start_col, start_row = c_idx, r_idx - i
-                            if self._can_place(word, start_col, start_row, 'V'):
-                                placements.append((start_col, start_row, 'V'))
+        seen = set()
+        codes = self._encoded[word]
+        can_place = self.board.can_place
+        for code, offsets in self._letter_positions[word].items():
+            for r_idx, c_idx in self._letter_cells.get(code, ()):
+                for i in offsets:
+                    # Try placing horizontally
+                    candidate = (c_idx - i, r_idx, 'H')
+                    if candidate not in seen:
+                        seen.add(candidate)
+                        if can_place(codes, c_idx - i, r_idx, True):
+                            placements.append(candidate)
+
+                    # Try placing vertically
+                    candidate = (c_idx, r_idx - i, 'V')
+                    if candidate not in seen:
+                        seen.add(candidate)
+                        if can_place(codes, c_idx, r_idx - i, False):
+                            placements.append(candidate)
         return placements
 
     def _can_place(self, word, c, r, direction):
         """Checks if a word can be legally placed at a given location."""
-        # 1. Bounds check
-        if r < 0 or c < 0: return False
-        
-        if direction == 'H':
-            if c + len(word) > self.grid_size: return False
-            # Check for conflicts and adjacencies
-            for i in range(len(word)):
-                # If cell is occupied, it must match the letter at the intersection
-                if self.grid[r][c+i] != '' and self.grid[r][c+i] != word[i]:
-                    return False
-                # If cell is empty, check neighbors
-                if self.grid[r][c+i] == '':
-                    if (r > 0 and self.grid[r-1][c+i] != '') or \
-                       (r < self.grid_size-1 and self.grid[r+1][c+i] != ''):
-                        return False
-            # Check ends of the word
-            if (c > 0 and self.grid[r][c-1] != '') or \
-               (c + len(word) < self.grid_size and self.grid[r][c+len(word)] != ''):
-                return False
-        
-        else: # Vertical
-            if r + len(word) > self.grid_size: return False
-            # Check for conflicts and adjacencies
-            for i in range(len(word)):
-                if self.grid[r+i][c] != '' and self.grid[r+i][c] != word[i]:
-                    return False
-                if self.grid[r+i][c] == '':
-                    if (c > 0 and self.grid[r+i][c-1] != '') or \
-                       (c < self.grid_size-1 and self.grid[r+i][c+1] != ''):
-                        return False
-            # Check ends of the word
-            if (r > 0 and self.grid[r-1][c] != '') or \
-               (r + len(word) < self.grid_size and self.grid[r+len(word)][c] != ''):
-                return False
-        return True
-
-    def _place_word(self, word, c, r, direction):
-        """Places a word on the grid and returns a snapshot for backtracking."""
-        snapshot = []
-        for i, char in enumerate(word):
-            if direction == 'H':
-                cur_c, cur_r = c + i, r
-            else: # Vertical
-                cur_c, cur_r = c, r + i
-            
-            # Bounds check before accessing grid
-            if cur_r < 0 or cur_r >= self.grid_size or cur_c < 0 or cur_c >= self.grid_size:
-                # If we hit an invalid coordinate, revert what we've placed so far
-                self._revert_placement(snapshot)
-                return None
-            
-            original_char = self.grid[cur_r][cur_c]
-            snapshot.append((cur_c, cur_r, original_char))
-            self.grid[cur_r][cur_c] = char
-        return snapshot
-    
-    def _revert_placement(self, snapshot):
-        """Reverts a word placement using a snapshot."""
-        for c, r, original_char in snapshot:
-            self.grid[r][c] = original_char
+        return self.board.can_place(self._encoded[word], c, r, direction == 'H')
 
     def print_grid(self):
         """Prints a cropped, readable version of the grid."""
-        min_r, max_r, min_c, max_c = self.grid_size, -1, self.grid_size, -1
-        for r in range(self.grid_size):
-            for c in range(self.grid_size):
-                if self.grid[r][c] != '':
-                    min_r, max_r = min(min_r, r), max(max_r, r)
-                    min_c, max_c = min(min_c, c), max(max_c, c)
-
-        if max_r == -1: return
+        grid = self.grid
+        box = self.bounding_box()
+        if box is None: return
+        min_r, min_c, max_r, max_c = box
 
         print("--- Generated Crossword Grid ---")
         for r in range(min_r, max_r + 1):
             for c in range(min_c, max_c + 1):
-                char = self.grid[r][c]
+                char = grid[r][c]
                 print(char if char else '#', end=' ')
             print()
 
 # --- Main execution block ---
 if __name__ == "__main__":
-    
+    from request import request
+
     def clean_word_from_llm_output(raw_string):
         """
         Cleans a raw string from the LLM to be a valid crossword word.
@@ -209,7 +931,7 @@ Provide the output as a numbered list in the format:
 WORD - Clue"""
 
 # --- Now, call your request function with the prompt ---
-    results = request(prompt)
+    results, _ = request(prompt)
     # --- Step 2: Clean the words using our helper function ---
     # This is the corrected line that fixes the bug.
     words = [clean_word_from_llm_output(w) for _, w, _ in results]
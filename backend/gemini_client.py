@@ -0,0 +1,278 @@
+"""Long-lived Gemini client shared by every request in a process.
+
+``get_client()`` builds one ``genai.Client`` per process (its HTTP connection
+pool is reused across calls) and wraps it with timeouts, jittered exponential
+retries on transient errors and a circuit breaker that fails fast while the
+upstream is down. ``generate()`` is blocking, ``generate_stream()`` yields the
+response in chunks as it arrives and ``agenerate()`` is the asyncio equivalent.
+
+Environment variables:
+  - GEMINI_API_KEY or GOOGLE_API_KEY: your Gemini API key
+  - GEMINI_MODEL or GEMINI_MODEL_NAME (optional): model name, default 'gemini-2.5-flash'
+  - GEMINI_BASE_URL (optional): API endpoint, e.g. a local fake server for testing
+  - GEMINI_TIMEOUT_MS: timeout applied to each phase of a call (connect, write, read)
+  - GEMINI_MAX_RETRIES, GEMINI_RETRY_BASE_MS, GEMINI_RETRY_MAX_MS: retry schedule
+  - GEMINI_BREAKER_FAILURES, GEMINI_BREAKER_RESET_SECONDS: circuit breaker
+
+Passing ``response_schema`` to a call asks for JSON output matching it
+(request.py does so unless GEMINI_JSON_OUTPUT=false).
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Optional
+
+import httpx
+from google import genai
+from google.genai import errors as genai_errors
+from google.genai import types
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int((os.getenv(name) or '').strip() or default)
+    except ValueError:
+        return default
+
+
+class GeminiUnavailableError(Exception):
+    """The circuit breaker is open: recent calls failed, so this one is not attempted."""
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures and stays open for
+    ``reset_seconds``; then a single trial call decides whether it closes again."""
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_seconds:
+                return 'half-open'
+            return 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_running = False
+
+
+def _is_transient(exc: Exception) -> bool:
+    """Timeouts, dropped connections, rate limits and 5xx responses are worth retrying."""
+    if isinstance(exc, (httpx.TimeoutException, httpx.TransportError, ConnectionError, TimeoutError)):
+        return True
+    if isinstance(exc, genai_errors.ServerError):
+        return True
+    if isinstance(exc, genai_errors.APIError):
+        return getattr(exc, 'code', None) in (408, 429)
+    return False
+
+
+def response_text(response) -> str:
+    """The text of a generate_content response, joined across candidate parts if needed."""
+    # Prefer the convenient aggregated text property if available.
+    text = getattr(response, "text", None)
+    if isinstance(text, str) and text.strip():
+        return text.strip()
+    # Fallback: manually join all candidate parts' text.
+    parts_texts = []
+    for candidate in getattr(response, "candidates", []) or []:
+        c_content = getattr(candidate, "content", None)
+        if c_content is None:
+            continue
+        for part in getattr(c_content, "parts", []) or []:
+            t = getattr(part, "text", None)
+            if isinstance(t, str):
+                parts_texts.append(t)
+    return "\n".join(parts_texts).strip()
+
+
+def response_usage(response) -> Optional[dict]:
+    """Token counts from a response's usage_metadata, or None if it reports none.
+
+    Thinking tokens are billed as output, so they count towards the completion.
+    """
+    meta = getattr(response, "usage_metadata", None)
+    if meta is None:
+        return None
+    prompt = getattr(meta, "prompt_token_count", None) or 0
+    completion = (getattr(meta, "candidates_token_count", None) or 0) + (getattr(meta, "thoughts_token_count", None) or 0)
+    total = getattr(meta, "total_token_count", None) or prompt + completion
+    return {'prompt_tokens': prompt, 'completion_tokens': completion, 'total_tokens': total}
+
+
+class GeminiClient:
+    def __init__(self, api_key: str, model: str, base_url: Optional[str] = None, timeout_ms: int = 30000,
+                 max_retries: int = 2, retry_base_ms: int = 250, retry_max_ms: int = 4000,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.model = model
+        self.max_retries = max(0, max_retries)
+        self.retry_base = retry_base_ms / 1000.0
+        self.retry_max = retry_max_ms / 1000.0
+        self.breaker = breaker or CircuitBreaker()
+        # The SDK passes this to every httpx request, which applies it to the
+        # connect, write and read phases alike.
+        http_options = types.HttpOptions(timeout=timeout_ms, base_url=base_url)
+        self._client = genai.Client(api_key=api_key, http_options=http_options)
+
+    @classmethod
+    def from_env(cls) -> 'GeminiClient':
+        api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+        model = os.getenv("GEMINI_MODEL") or os.getenv("GEMINI_MODEL_NAME") or "gemini-2.5-flash"
+        # Normalize model names like '...-latest' to the base model ID.
+        if model.endswith("-latest"):
+            model = model[:-7]
+        breaker = CircuitBreaker(
+            failure_threshold=_env_int('GEMINI_BREAKER_FAILURES', 5),
+            reset_seconds=_env_int('GEMINI_BREAKER_RESET_SECONDS', 30),
+        )
+        return cls(
+            api_key=api_key,
+            model=model,
+            base_url=(os.getenv('GEMINI_BASE_URL') or '').strip() or None,
+            timeout_ms=_env_int('GEMINI_TIMEOUT_MS', 30000),
+            max_retries=_env_int('GEMINI_MAX_RETRIES', 2),
+            retry_base_ms=_env_int('GEMINI_RETRY_BASE_MS', 250),
+            retry_max_ms=_env_int('GEMINI_RETRY_MAX_MS', 4000),
+            breaker=breaker,
+        )
+
+    @staticmethod
+    def _config(response_schema):
+        if response_schema is None:
+            return None
+        return types.GenerateContentConfig(response_mime_type='application/json', response_schema=response_schema)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps retries from many workers from arriving in lockstep
+        return random.uniform(0, min(self.retry_max, self.retry_base * (2 ** attempt)))
+
+    def _record_outcome(self, exc: Exception) -> None:
+        if isinstance(exc, genai_errors.ClientError) and not _is_transient(exc):
+            # The upstream answered; a bad request says nothing about its health
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+
+    def generate(self, prompt: str, response_schema=None):
+        """Call generate_content with retries; returns the SDK response.
+
+        Raises GeminiUnavailableError while the circuit is open, or the last
+        error once retries are used up.
+        """
+        if not self.breaker.allow():
+            raise GeminiUnavailableError('Gemini upstream unavailable (circuit open)')
+        config = self._config(response_schema)
+        attempt = 0
+        while True:
+            try:
+                response = self._client.models.generate_content(model=self.model, contents=prompt, config=config)
+            except Exception as e:
+                if _is_transient(e) and attempt < self.max_retries:
+                    delay = self._backoff(attempt)
+                    attempt += 1
+                    print(f"Gemini call failed ({e}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                    time.sleep(delay)
+                    continue
+                self._record_outcome(e)
+                raise
+            self.breaker.record_success()
+            return response
+
+    def generate_stream(self, prompt: str, response_schema=None):
+        """Like ``generate`` but yields response chunks as they arrive.
+
+        Transient errors are retried only until the first chunk has been
+        yielded; after that they propagate to the caller.
+        """
+        if not self.breaker.allow():
+            raise GeminiUnavailableError('Gemini upstream unavailable (circuit open)')
+        config = self._config(response_schema)
+        attempt = 0
+        while True:
+            received = False
+            try:
+                for chunk in self._client.models.generate_content_stream(model=self.model, contents=prompt,
+                                                                         config=config):
+                    received = True
+                    yield chunk
+            except GeneratorExit:
+                # The caller stopped reading; the upstream itself was fine
+                self.breaker.record_success()
+                raise
+            except Exception as e:
+                if not received and _is_transient(e) and attempt < self.max_retries:
+                    delay = self._backoff(attempt)
+                    attempt += 1
+                    print(f"Gemini stream failed ({e}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                    time.sleep(delay)
+                    continue
+                self._record_outcome(e)
+                raise
+            self.breaker.record_success()
+            return
+
+    async def agenerate(self, prompt: str, response_schema=None):
+        """Async version of ``generate`` using the SDK's asyncio client."""
+        if not self.breaker.allow():
+            raise GeminiUnavailableError('Gemini upstream unavailable (circuit open)')
+        config = self._config(response_schema)
+        attempt = 0
+        while True:
+            try:
+                response = await self._client.aio.models.generate_content(model=self.model, contents=prompt,
+                                                                          config=config)
+            except Exception as e:
+                if _is_transient(e) and attempt < self.max_retries:
+                    delay = self._backoff(attempt)
+                    attempt += 1
+                    print(f"Gemini call failed ({e}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                self._record_outcome(e)
+                raise
+            self.breaker.record_success()
+            return response
+
+
+_lock = threading.Lock()
+_client: Optional[GeminiClient] = None
+_owner_pid: Optional[int] = None
+
+
+def get_client() -> GeminiClient:
+    """The process-wide client, created on first use (and again after a fork)."""
+    global _client, _owner_pid
+    with _lock:
+        if _client is None or _owner_pid != os.getpid():
+            _client = GeminiClient.from_env()
+            _owner_pid = os.getpid()
+        return _client
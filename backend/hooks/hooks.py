@@ -1,37 +1,14 @@
-from flask import request
-from datetime import datetime
-
-from models import ApiStatistic
-from utils.db_admin import admin_session_scope
-from extensions import db
+from flask import current_app, request
 
 
 def record_api_call(response):
-  req_method = request.method
-  req_endpoint = request.path
+  # Counted in memory and written in batches by the ApiStatsRecorder
+  recorder = current_app.extensions.get('api_stats')
+  if recorder is None:
+    return response
   try:
-    # Look up the existing stat
-    stat = ApiStatistic.query.filter_by(
-        method=req_method, 
-        endpoint=req_endpoint
-        ).first()
-
-    if stat:
-      # Increment count
-      stat.count += 1
-      stat.recorded_at = datetime.utcnow()
-      with admin_session_scope() as s:
-        s.merge(stat)
-    else:
-      # Create new record
-      new_stat = ApiStatistic(method=req_method, endpoint=req_endpoint, count=1, recorded_at=datetime.utcnow())
-      with admin_session_scope() as s:
-        s.add(new_stat)
-
-    db.session.commit()
-
+    recorder.record(request.method, request.path)
   except Exception as e:
-    db.session.rollback()
-    print(f"Error saving API call stat: {e}")
-            
+    print(f"Error recording API call stat: {e}")
+
   return response
@@ -48,7 +48,7 @@ class GameSession(db.Model):
     definitions_json = db.Column(db.Text)
     grid_json = db.Column(db.Text)
 
-    started_at = db.Column(db.DateTime, server_default=db.func.current_timestamp())
+    started_at = db.Column(db.DateTime, server_default=db.func.current_timestamp(), index=True)
     finished_at = db.Column(db.DateTime)
     duration_ms = db.Column(db.Integer)
     status = db.Column(db.String(20), default='completed')
@@ -97,6 +97,23 @@ class UserDailyReset(db.Model):
     user = db.relationship('User')
 
 
+class UserDailyUsage(db.Model):
+    """Per-user, per-day (UTC) rollup of puzzle generations, kept up to date as they happen."""
+    __tablename__ = 'user_daily_usage'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    date = db.Column(db.Date, nullable=False, index=True)
+    calls = db.Column(db.Integer, nullable=False, default=0)
+    games = db.Column(db.Integer, nullable=False, default=0)
+    tokens = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, server_default=db.func.current_timestamp(), onupdate=db.func.current_timestamp())
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'date', name='uq_user_daily_usage_user_date'),
+    )
+
+    user = db.relationship('User')
+
+
 class User(db.Model):
     __tablename__ = 'users'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
@@ -147,3 +164,15 @@ class SavedGame(db.Model):
     started_at = db.Column(db.DateTime, server_default=db.func.current_timestamp())
 
     user = db.relationship('User')
+
+
+class TopicWordList(db.Model):
+    __tablename__ = 'topic_word_lists'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    topic_key = db.Column(db.String(100), nullable=False)
+    difficulty = db.Column(db.String(20), nullable=False)
+    pairs_json = db.Column(db.JSON, nullable=False)  # [[word, definition], ...]
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.current_timestamp())
+    __table_args__ = (
+        db.UniqueConstraint('topic_key', 'difficulty', name='uq_topic_word_list'),
+    )
@@ -2,90 +2,147 @@ import os
 import json
 import re
 
-from google import genai
+from gemini_client import GeminiUnavailableError, get_client, response_text, response_usage
 
 
-# prompt format: Generate 20 one-word terms related to [topic]. Do not use bold (**), punctuation marks,
-# or formatting other than the pattern WORD - description.
-def request(prompt):
-    """
-    Calls Google Gemini API (via google-genai SDK) to generate a list of words and definitions.
+def _missing_key_error():
+    if os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY"):
+        return None
+    error_msg = {
+        "error": "Missing Gemini API key",
+        "details": "Set GEMINI_API_KEY or GOOGLE_API_KEY in backend/.env",
+    }
+    return [(0, "Error", json.dumps(error_msg, indent=2, ensure_ascii=False))]
 
-    Environment variables:
-      - GEMINI_API_KEY or GOOGLE_API_KEY: your Gemini API key
-      - GEMINI_MODEL or GEMINI_MODEL_NAME (optional): model name, default 'gemini-2.5-flash'
-    """
-    api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-    model = os.getenv("GEMINI_MODEL") or os.getenv("GEMINI_MODEL_NAME") or "gemini-2.5-flash"
 
-    # Normalize model names like '...-latest' to the base model ID.
-    if isinstance(model, str) and model.endswith("-latest"):
-        model = model[:-7]
+def _call_error(e):
+    print(f"Gemini client error: {e}")
+    error_msg = {
+        "error": "Request failed when calling Gemini generate_content",
+        "details": str(e),
+    }
+    return [(0, "Error", json.dumps(error_msg, indent=2, ensure_ascii=False))]
+
+
+# Line formats the model uses, tried in order
+_BOLD_OR_PLAIN_LINE = re.compile(r"^\**\s*(.*?)\**\s*[:\-]\s*(.*)$")  # **Cheetah**: Fastest land animal.
+_NUMBERED_LINE = re.compile(r"^\d+\.\s*(.*?)\s*[:\-]\s*(.*)$")  # 1. WORD - definition
+_SIMPLE_LINE = re.compile(r"^([A-Za-z]+)\s*[:\-]\s*(.*)$")  # WORD - definition
+_MARKUP = re.compile(r"[*_]+")
+
+
+def _match_line(line):
+    """The (raw word, definition) of a response line, or None if it is not a word line."""
+    match = _BOLD_OR_PLAIN_LINE.match(line) or _NUMBERED_LINE.match(line) or _SIMPLE_LINE.match(line)
+    return match.groups() if match else None
+
+
+def _parse_lines(lines, start=0):
+    """Yields (i, word, definition) for the word lines, numbering from ``start + 1``."""
+    i = start
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        groups = _match_line(line)
+        if groups:
+            i += 1
+            raw_word, definition = groups
+            clean_word = _MARKUP.sub("", raw_word).strip()  # remove * or _
+            if clean_word and definition.strip():
+                yield (i, clean_word, definition.strip())
+
+
+def parse_word_text(content):
+    """Parses "WORD - Clue" style lines into (i, word, definition) tuples."""
+    return list(_parse_lines(content.split("\n")))
 
-    if not api_key:
-        error_msg = {
-            "error": "Missing Gemini API key",
-            "details": "Set GEMINI_API_KEY or GOOGLE_API_KEY in backend/.env",
-        }
-        return [(0, "Error", json.dumps(error_msg, indent=2, ensure_ascii=False))]
 
+# Structured output: a JSON array of {"word", "clue"} objects
+WORD_LIST_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {"word": {"type": "STRING"}, "clue": {"type": "STRING"}},
+        "required": ["word", "clue"],
+    },
+}
+
+
+def _json_output_enabled():
+    return (os.getenv("GEMINI_JSON_OUTPUT") or "true").strip().lower() == "true"
+
+
+def _json_items(items, start=0):
+    """Yields (i, word, definition) for the {"word", "clue"} objects, numbering from ``start + 1``."""
+    i = start
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        word = str(item.get("word") or "").strip()
+        clue = str(item.get("clue") or "").strip()
+        if word and clue:
+            i += 1
+            yield (i, word, clue)
+
+
+def parse_word_json(content):
+    """Parses a structured-output response body; returns None if it is not a JSON array."""
+    content = content.strip()
+    if content.startswith("```"):
+        # A Markdown code fence around the JSON
+        content = content.split("\n", 1)[-1].rsplit("```", 1)[0]
     try:
-        client = genai.Client(api_key=api_key)
-        response = client.models.generate_content(
-            model=model,
-            contents=prompt,
-        )
-    except Exception as e:
-        print(f"Gemini client error: {e}")
-        error_msg = {
-            "error": "Request failed when calling Gemini generate_content",
-            "details": str(e),
-        }
-        return [(0, "Error", json.dumps(error_msg, indent=2, ensure_ascii=False))]
+        items = json.loads(content)
+    except ValueError:
+        return None
+    if not isinstance(items, list):
+        return None
+    return list(_json_items(items))
+
+
+def _iter_json_array(chunks):
+    """Yields each element of a streamed JSON array as soon as it is complete."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = None
+    for text in chunks:
+        buffer += text
+        if pos is None:
+            start = buffer.find("[")
+            if start < 0:
+                continue
+            pos = start + 1
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer) or buffer[pos] == "]":
+                break
+            try:
+                item, pos = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                break  # incomplete; wait for the next chunk
+            yield item
 
+
+def parse_word_list(response, structured=False):
+    """Parses a generate_content response into (i, word, definition) tuples.
+
+    With ``structured`` the body is read as JSON first, falling back to the
+    line format if it is not valid JSON.
+    """
     try:
-        # Prefer the convenient aggregated text property if available.
-        content = ""
-        text = getattr(response, "text", None)
-        if isinstance(text, str) and text.strip():
-            content = text.strip()
-        else:
-            # Fallback: manually join all candidate parts' text.
-            parts_texts = []
-            for candidate in getattr(response, "candidates", []) or []:
-                c_content = getattr(candidate, "content", None)
-                if c_content is None:
-                    continue
-                for part in getattr(c_content, "parts", []) or []:
-                    t = getattr(part, "text", None)
-                    if isinstance(t, str):
-                        parts_texts.append(t)
-            content = "\n".join(parts_texts).strip()
+        content = response_text(response)
 
         if not content:
             print(f"Empty response from Gemini API. Raw response: {response}")
             return []
 
-        lines = [line.strip() for line in content.split("\n") if line.strip()]
-        response_list = []
-        i = 0
-        for line in lines:
-            # Match formats like: **Cheetah**: Fastest land animal.
-            # Also try to match numbered lists like "1. WORD - definition" or "WORD - definition"
-            match = re.match(r"^\**\s*(.*?)\**\s*[:\-]\s*(.*)$", line)
-            if not match:
-                # Try alternative format: "1. WORD - definition" or "WORD - definition"
-                match = re.match(r"^\d+\.\s*(.*?)\s*[:\-]\s*(.*)$", line)
-            if not match:
-                # Try simple format: "WORD - definition"
-                match = re.match(r"^([A-Za-z]+)\s*[:\-]\s*(.*)$", line)
-
-            if match:
-                i += 1
-                raw_word, definition = match.groups()
-                clean_word = re.sub(r"[*_]+", "", raw_word).strip()  # remove * or _
-                if clean_word and definition.strip():
-                    response_list.append((i, clean_word, definition.strip()))
+        response_list = parse_word_json(content) if structured else None
+        if response_list is None:
+            if structured:
+                print("Gemini response is not a JSON word list; parsing it as text")
+            response_list = parse_word_text(content)
 
         print(f"Parsed {len(response_list)} words from Gemini API response")
         if len(response_list) == 0:
@@ -100,12 +157,114 @@ def request(prompt):
         return [(0, "Error", json.dumps(error_msg, indent=2, ensure_ascii=False))]
 
 
+# prompt format: Generate 20 one-word terms related to [topic]. Do not use bold (**), punctuation marks,
+# or formatting other than the pattern WORD - description.
+def request(prompt):
+    """
+    Calls Google Gemini API (via the shared client in gemini_client.py) to generate a list of words and definitions.
+
+    Asks for JSON matching WORD_LIST_SCHEMA unless GEMINI_JSON_OUTPUT=false.
+    Returns ``(results, usage)``: (i, word, definition) tuples, or a single
+    (0, "Error", details) tuple when the call fails, and the tokens the call
+    used as reported by Gemini ({'prompt_tokens', 'completion_tokens',
+    'total_tokens'}, None if no call was billed). Raises GeminiUnavailableError
+    without calling out while the circuit breaker is open. See gemini_client.py
+    for the environment variables.
+    """
+    missing = _missing_key_error()
+    if missing:
+        return missing, None
+
+    structured = _json_output_enabled()
+    try:
+        response = get_client().generate(prompt, WORD_LIST_SCHEMA if structured else None)
+    except GeminiUnavailableError:
+        raise
+    except Exception as e:
+        return _call_error(e), None
+    return parse_word_list(response, structured), response_usage(response)
+
+
+def request_stream(prompt, usage=None):
+    """
+    Streaming version of ``request``: yields (i, word, definition) tuples as
+    soon as each array element (or, for text output, each line) has arrived.
+
+    A failure yields a single (0, "Error", details) tuple, after any words
+    already parsed. If a ``usage`` dict is given it is filled with the call's
+    token counts once the stream ends. Raises GeminiUnavailableError while
+    the circuit breaker is open.
+    """
+    missing = _missing_key_error()
+    if missing:
+        yield from missing
+        return
+
+    structured = _json_output_enabled()
+    parsed = 0
+    received = []
+
+    def texts():
+        for chunk in get_client().generate_stream(prompt, WORD_LIST_SCHEMA if structured else None):
+            # Each chunk carries the running token counts; the last one has the totals
+            counts = response_usage(chunk)
+            if counts and usage is not None:
+                usage.update(counts)
+            text = getattr(chunk, "text", None)
+            if isinstance(text, str):
+                received.append(text)
+                yield text
+
+    try:
+        if structured:
+            for item in _json_items(_iter_json_array(texts())):
+                parsed = item[0]
+                yield item
+        else:
+            pending = ""
+            for text in texts():
+                # Only complete lines are parsed; the last piece may continue in the next chunk
+                *lines, pending = (pending + text).split("\n")
+                for item in _parse_lines(lines, parsed):
+                    parsed = item[0]
+                    yield item
+            for item in _parse_lines([pending], parsed):
+                parsed = item[0]
+                yield item
+    except GeminiUnavailableError:
+        raise
+    except Exception as e:
+        yield from _call_error(e)
+        return
+    if structured and not parsed and received:
+        print("Streamed Gemini response is not a JSON word list; parsing it as text")
+        for item in parse_word_text("".join(received)):
+            parsed = item[0]
+            yield item
+    print(f"Parsed {parsed} words from streamed Gemini API response")
+
+
+async def arequest(prompt):
+    """Asyncio version of ``request``."""
+    missing = _missing_key_error()
+    if missing:
+        return missing, None
+
+    structured = _json_output_enabled()
+    try:
+        response = await get_client().agenerate(prompt, WORD_LIST_SCHEMA if structured else None)
+    except GeminiUnavailableError:
+        raise
+    except Exception as e:
+        return _call_error(e), None
+    return parse_word_list(response, structured), response_usage(response)
+
+
 if __name__ == "__main__":
-    results = request(
+    results, usage = request(
         "Generate 20 one-word terms related to JavaScript. "
         "Do not use bold (**), punctuation marks, or formatting other than the pattern WORD - description."
     )
     for _, word, definition in results:
         print(f"{word}: {definition}")
-
-
+    print(f"Tokens: {usage}")
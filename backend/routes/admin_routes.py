@@ -1,11 +1,14 @@
 import os
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy import func
 
 from extensions import db
-from utils.db_admin import admin_session_scope
-from models import User, UserRole, AppSetting, UserQuota, ApiUsage, GameSession, PasswordReset, UserDailyReset, ApiStatistic, SavedGame
+from utils.db_admin import admin_session_scope, admin_pool_stats
+from utils.db_read import read_session
+from utils.db_upsert import upsert_add
+from services.quota_service import utc_today
+from models import User, UserRole, AppSetting, UserQuota, ApiUsage, GameSession, PasswordReset, UserDailyReset, UserDailyUsage, ApiStatistic, SavedGame
 from constants import DEFAULT_DAILY_FREE_LIMIT
 import strings
 
@@ -125,6 +128,9 @@ def update_settings():
             else:
                 row.value = val
         changed['DAILY_FREE_LIMIT'] = val
+        quotas = current_app.extensions.get('quota')
+        if quotas:
+            quotas.invalidate()
     # ignore FREE_CALLS_LIMIT (deprecated)
     return jsonify({'success': True, 'changed': changed})
 
@@ -286,6 +292,10 @@ def reset_usage():
                     ApiUsage.count: 0,
                     ApiUsage.last_used_at: func.current_timestamp()
                 })
+                # Today's counts drive the daily limit, so clear them as well
+                s.query(UserDailyUsage).filter_by(date=utc_today()).update(
+                    {UserDailyUsage.calls: 0, UserDailyUsage.games: 0, UserDailyUsage.tokens: 0},
+                    synchronize_session=False)
                 return jsonify({'success': True, 'reset': 'all', 'rows': int(updated or 0)})
 
             user = s.query(User).filter_by(username=username).first()
@@ -295,6 +305,9 @@ def reset_usage():
                 ApiUsage.count: 0,
                 ApiUsage.last_used_at: func.current_timestamp()
             })
+            s.query(UserDailyUsage).filter_by(user_id=user.id, date=utc_today()).update(
+                {UserDailyUsage.calls: 0, UserDailyUsage.games: 0, UserDailyUsage.tokens: 0},
+                synchronize_session=False)
             return jsonify({'success': True, 'reset': username, 'rows': int(updated or 0)})
     except Exception as e:
         # Provide clearer guidance if UPDATE is also denied
@@ -309,7 +322,8 @@ def reset_usage():
 def reset_usage_today():
     """Reset today's daily puzzle limit for a user.
     Allows a user to bypass the daily generation limit for the current day.
-    This works by creating a reset marker; it does not delete any history.
+    This works by zeroing today's usage rollup; it does not delete any history.
+    A reset marker (user_daily_resets) is also written, for audit only.
     Requires admin privileges.
     ---
     tags:
@@ -339,34 +353,33 @@ def reset_usage_today():
     """
     if not require_admin(): return jsonify({'success': False, 'error': strings.MSG_FORBIDDEN}), 403
     from datetime import datetime
-    from models import UserDailyReset
+    from models import UserDailyReset, UserDailyUsage
     data = request.get_json(silent=True) or {}
     username = (data.get('username') or '').strip()
     now = datetime.utcnow()
-    today = now.date()
+    today = utc_today()
 
     try:
         with admin_session_scope() as s:
             if username in ('*', 'all', ''):
-                # Set/reset marker for all known users present in ApiUsage table
+                # Clear today's counts for everyone, then record audit markers for all
+                # known users present in ApiUsage table in one statement
                 user_ids = [r[0] for r in s.query(ApiUsage.user_id).distinct().all()]
-                for uid in user_ids:
-                    row = s.query(UserDailyReset).filter_by(user_id=uid, date=today).first()
-                    if not row:
-                        row = UserDailyReset(user_id=uid, date=today, reset_at=now)
-                        s.add(row)
-                    else:
-                        row.reset_at = now
+                s.query(UserDailyUsage).filter_by(date=today).update(
+                    {UserDailyUsage.calls: 0, UserDailyUsage.games: 0, UserDailyUsage.tokens: 0},
+                    synchronize_session=False)
+                upsert_add(s, UserDailyReset.__table__,
+                           [{'user_id': uid, 'date': today, 'reset_at': now} for uid in user_ids],
+                           keys=('user_id', 'date'), counters=())
                 return jsonify({'success': True, 'reset_today': 'all', 'users': len(user_ids)})
 
             user = s.query(User).filter_by(username=username).first()
             if not user: return jsonify({'success': False, 'error': strings.MSG_USER_NOT_FOUND}), 404
-            row = s.query(UserDailyReset).filter_by(user_id=user.id, date=today).first()
-            if not row:
-                row = UserDailyReset(user_id=user.id, date=today, reset_at=now)
-                s.add(row)
-            else:
-                row.reset_at = now
+            s.query(UserDailyUsage).filter_by(user_id=user.id, date=today).update(
+                {UserDailyUsage.calls: 0, UserDailyUsage.games: 0, UserDailyUsage.tokens: 0},
+                synchronize_session=False)
+            upsert_add(s, UserDailyReset.__table__, [{'user_id': user.id, 'date': today, 'reset_at': now}],
+                       keys=('user_id', 'date'), counters=())
             return jsonify({'success': True, 'reset_today': username})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -397,12 +410,19 @@ def get_api_usage_stats():
                   method: { type: string }
                   endpoint: { type: string }
                   count: { type: integer }
+            recorder:
+              type: object
+              description: This worker's buffered recorder (calls recorded, pending, flushes, failures).
       403:
         description: Forbidden. The current user is not an admin.
     """
     if not require_admin(): return jsonify({'success': False, 'error': strings.MSG_FORBIDDEN}), 403
+    # Write this worker's buffered counts first; other workers flush on their own schedule
+    recorder = current_app.extensions.get('api_stats')
+    if recorder:
+        recorder.flush()
     try:
-        with admin_session_scope() as s:
+        with read_session(admin_session_scope) as s:
             stats = s.query(
                 ApiStatistic.method,
                 ApiStatistic.endpoint,
@@ -416,10 +436,96 @@ def get_api_usage_stats():
                 }
                 for row in stats
             ]
-            return jsonify({'success': True, 'stats': result})
+            return jsonify({'success': True, 'stats': result, 'recorder': recorder.stats() if recorder else None})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@admin_bp.route('/admin/puzzle-pool', methods=['GET'])
+@jwt_required()
+def get_puzzle_pool_stats():
+    """Get puzzle pool and word cache statistics.
+    Reports hit/miss counters for this server process's pre-generated puzzle pool and
+    topic word-list cache, how many puzzles are ready per (topic, difficulty), and how
+    many LLM calls were shared between concurrent identical requests.
+    Requires admin privileges.
+    ---
+    tags:
+      - Admin
+    security:
+      - bearerAuth: []
+    responses:
+      200:
+        description: Statistics retrieved successfully. Disabled components are reported as null.
+        schema:
+          type: object
+          properties:
+            success: { type: boolean }
+            pool:
+              type: object
+              properties:
+                hits: { type: integer }
+                misses: { type: integer }
+                hit_rate: { type: number }
+                produced: { type: integer }
+                failures: { type: integer }
+                size: { type: integer }
+                low_watermark: { type: integer }
+                pools:
+                  type: array
+                  items:
+                    type: object
+                    properties:
+                      topic: { type: string }
+                      difficulty: { type: string }
+                      ready: { type: integer }
+            word_cache:
+              type: object
+              properties:
+                entries: { type: integer }
+                hits: { type: integer }
+                misses: { type: integer }
+            word_flight:
+              type: object
+              description: LLM calls made vs. requests that shared another request's call.
+              properties:
+                calls: { type: integer }
+                shared: { type: integer }
+                in_flight: { type: integer }
+            word_bank:
+              type: object
+              description: Local word bank size and lookups that found / did not find words.
+              properties:
+                path: { type: string }
+                entries: { type: integer }
+                hits: { type: integer }
+                misses: { type: integer }
+            admin_db_pool:
+              type: object
+              description: This worker's admin DB connection pool (null until first used).
+              properties:
+                engines_created: { type: integer }
+                status: { type: string }
+                size: { type: integer }
+                checkedin: { type: integer }
+                checkedout: { type: integer }
+                overflow: { type: integer }
+      403:
+        description: Forbidden. The current user is not an admin.
+    """
+    if not require_admin(): return jsonify({'success': False, 'error': strings.MSG_FORBIDDEN}), 403
+    pool = current_app.extensions.get('puzzle_pool')
+    word_cache = current_app.extensions.get('word_cache')
+    word_flight = current_app.extensions.get('word_flight')
+    word_bank = current_app.extensions.get('word_bank')
+    return jsonify({
+        'success': True,
+        'pool': pool.stats() if pool else None,
+        'word_cache': word_cache.stats() if word_cache else None,
+        'word_flight': word_flight.stats() if word_flight else None,
+        'word_bank': word_bank.stats() if word_bank else None,
+        'admin_db_pool': admin_pool_stats(),
+    })
+
 @admin_bp.route('/admin/users/delete', methods=['POST'])
 @jwt_required()
 def delete_user_and_related():
@@ -482,6 +588,7 @@ def delete_user_and_related():
             deleted['game_sessions'] = s.query(GameSession).filter_by(user_id=user.id).delete(synchronize_session=False) or 0
             deleted['password_resets'] = s.query(PasswordReset).filter_by(user_id=user.id).delete(synchronize_session=False) or 0
             deleted['user_daily_resets'] = s.query(UserDailyReset).filter_by(user_id=user.id).delete(synchronize_session=False) or 0
+            deleted['user_daily_usage'] = s.query(UserDailyUsage).filter_by(user_id=user.id).delete(synchronize_session=False) or 0
             deleted['user_roles'] = s.query(UserRole).filter_by(user_id=user.id).delete(synchronize_session=False) or 0
             deleted['user_quotas'] = s.query(UserQuota).filter_by(user_id=user.id).delete(synchronize_session=False) or 0
             # finally remove the user record itself
@@ -1,24 +1,27 @@
-from flask import Blueprint, request as flask_request, jsonify
+from flask import Blueprint, current_app, request as flask_request, jsonify
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, jwt_required
 from crossword_grid_generator import CrosswordGenerator
-from request import request as generate_words
-from services.usage_service import UsageService
+from request import request as generate_words, request_stream as stream_words
+from gemini_client import GeminiUnavailableError
+from services.portfolio_service import PortfolioService
 from extensions import db
-from models import GameSession, User, UserRole, UserQuota, AppSetting, ApiUsage, SavedGame
-from utils.tokens import estimate_tokens
-from datetime import datetime, timedelta
-from constants import DEFAULT_DAILY_FREE_LIMIT
+from utils.db_read import read_session
+from models import GameSession, User, UserRole, SavedGame
+from datetime import datetime
+import math
+from constants import DIFF_LEVELS
 import strings
 
 
 puzzle_bp = Blueprint('puzzle', __name__)
-usage = UsageService()
+GENERATE_ENDPOINT = '/api/v1/generate-crossword'
 
-DIFF_LEVELS = {
-    'easy': 10,
-    'medium': 15,
-    'hard': 20
-}
+# Response layouts for /generate-crossword:
+#   full    - the whole grid_size x grid_size board (version 1, the default)
+#   cropped - the board cropped to the placed words, plus its origin
+#   sparse  - no grid at all; the client rebuilds it from the word coordinates
+RESPONSE_FORMATS = ('full', 'cropped', 'sparse')
+RESPONSE_FORMAT_VERSION = 2
 
 # THIS IS THE CORRECT VERSION TO USE
 
@@ -59,6 +62,260 @@ def _clean_llm_term(raw_string: str) -> str:
     
     return cleaned_word
 
+def _is_word_list(results) -> bool:
+    """True for a parsed word list, false for an empty or error result."""
+    return bool(results) and not any(len(item) >= 2 and item[1] == "Error" for item in results)
+
+
+def _clean_pair(item):
+    """The cleaned ``(word, definition)`` of one ``(i, word, definition)`` result, or None to skip it."""
+    try:
+        # Ensure item is a tuple/list with at least 3 elements
+        if not isinstance(item, (tuple, list)) or len(item) < 3:
+            return None
+
+        _, raw_word, definition = item
+
+        # Skip error responses from the API
+        if raw_word == "Error" or (isinstance(definition, str) and definition.startswith("{")):
+            print(f"Skipping error response: {item}")
+            return None
+
+        # Ensure raw_word is a string
+        if not isinstance(raw_word, str):
+            return None
+
+        # Apply the cleaning function here
+        cleaned_word = _clean_llm_term(raw_word)
+
+        # Only keep the pair if the cleaned word is not empty and has reasonable length
+        if cleaned_word and len(cleaned_word) > 0 and len(cleaned_word) <= CrosswordGenerator.MAX_GRID_SIZE:
+            return cleaned_word, (definition or '').strip()
+    except (ValueError, TypeError, IndexError) as e:
+        # Log the error for debugging but continue processing
+        print(f"Error processing word item: {item}, error: {e}")
+    except Exception as e:
+        # Catch any other unexpected errors
+        print(f"Unexpected error processing word item: {item}, error: {e}")
+    return None
+
+
+def _fetch_word_pairs(prompt: str, on_pair=None, usage=None):
+    """Ask the LLM for words and return ``(pairs, None)`` with cleaned (word, definition) pairs.
+
+    With ``on_pair`` the response is streamed and ``on_pair(word, definition)``
+    is called for each pair as soon as its line arrives. A ``usage`` dict is
+    filled with the tokens Gemini reports for the call. Neither happens when
+    this request shares another request's in-flight call instead.
+
+    On failure returns ``(None, (response, status))`` for the route to return as-is.
+    """
+    def call():
+        spent = {}
+        if on_pair is None:
+            results, counts = generate_words(prompt)
+            spent.update(counts or {})
+        else:
+            results = []
+            for item in stream_words(prompt, spent):
+                results.append(item)
+                pair = _clean_pair(item)
+                if pair:
+                    on_pair(*pair)
+        # Only the request that made the call is charged for it
+        if usage is not None:
+            usage.update(spent)
+        return results
+
+    try:
+        flight = current_app.extensions.get('word_flight')
+        if flight:
+            # Concurrent requests for the same prompt share one LLM call
+            results = flight.do(prompt, call, shareable=_is_word_list)
+        else:
+            results = call()
+    except GeminiUnavailableError as e:
+        # Recent calls failed; fail fast instead of tying up a worker on a dead upstream
+        print(f"Word generation API unavailable: {e}")
+        return None, (jsonify({'success': False, 'error': strings.MSG_GEN_SERVICE_UNAVAILABLE}), 503)
+    except Exception as e:
+        print(f"Error calling word generation API: {e}")
+        error_msg = str(e)
+        if "timeout" in error_msg.lower() or "connection" in error_msg.lower():
+            return None, (jsonify({'success': False, 'error': strings.MSG_GEN_SERVICE_CONNECTION_FAIL}), 502)
+        return None, (jsonify({'success': False, 'error': f'{strings.MSG_GEN_SERVICE_FAIL}: {error_msg}'}), 502)
+
+    if not results or len(results) == 0:
+        print("Word generation API returned empty results")
+        return None, (jsonify({'success': False, 'error': strings.MSG_GEN_SERVICE_EMPTY}), 502)
+
+    pairs = [pair for pair in map(_clean_pair, results) if pair]
+    if not pairs:
+        return None, (jsonify({'success': False, 'error': strings.MSG_GEN_FAILED}), 502)
+
+    return pairs, None
+
+
+def _word_prompt(topic: str, count: int) -> str:
+    # Use a more detailed, multi-line prompt to guide the LLM.
+    return f"""Generate a list of {count} vacabularies about {topic}. The list must be suitable for creating an interlocking crossword puzzle.
+Do not use bold (**), punctuation marks, or formatting other than the pattern WORD - description.
+Provide the output in the format:
+WORD - Clue"""
+
+
+def _bank_word_pairs(topic: str, count: int):
+    """Words for a topic from the local word bank, as ``(pairs, None)`` or ``(None, (response, status))``."""
+    word_bank = current_app.extensions.get('word_bank')
+    if not word_bank:
+        return None, (jsonify({'success': False, 'error': strings.MSG_WORD_BANK_UNAVAILABLE}), 503)
+    pairs = [pair for pair in map(_clean_pair, word_bank.request(topic, count)) if pair]
+    if not pairs:
+        return None, (jsonify({'success': False, 'error': strings.MSG_WORD_BANK_NO_MATCH}), 404)
+    return pairs, None
+
+
+def _build_puzzle(topic: str, level: str, source: str = 'llm'):
+    """Fetch words for a topic and lay them out; returns ``(puzzle, None)`` or ``(None, (response, status))``.
+
+    ``source`` is 'llm' or 'local' (the word bank). ``puzzle`` holds the
+    generator with its layout, the words it was given, their definitions,
+    whether every word was placed, the prompt, whether the words came from
+    the cache, the word source actually used and the LLM tokens spent.
+    """
+    word_count = DIFF_LEVELS.get(level, 10)
+    local = source == 'local'
+    # Tokens Gemini reports for this request's LLM call; stays empty without one
+    usage = {}
+
+    # Popular topics are served from the word-list cache without calling the LLM
+    word_cache = current_app.extensions.get('word_cache') if not local else None
+    cached_pairs = word_cache.get(topic, level) if word_cache else None
+    from_cache = bool(cached_pairs)
+    # Candidates to choose the puzzle's words from; the rest stand in for words that do not fit
+    surplus_count = word_count + math.ceil(word_count * max(0, current_app.config.get('CROSSWORD_SURPLUS_PERCENT') or 0) / 100)
+    # On a miss ask for extra words, so later requests can draw varied subsets
+    request_count = word_count * max(1, current_app.config.get('WORD_CACHE_POOL_FACTOR') or 1) if word_cache else word_count
+    request_count = max(request_count, surplus_count)
+    prompt = _word_prompt(topic, request_count)
+
+    strategy = current_app.config.get('CROSSWORD_STRATEGY', 'ordered')
+    time_limit_ms = current_app.config.get('CROSSWORD_TIME_LIMIT_MS')
+    time_limit = (time_limit_ms / 1000.0) if time_limit_ms else None
+    max_nodes = current_app.config.get('CROSSWORD_MAX_NODES') or None
+    optimize = bool(current_app.config.get('CROSSWORD_OPTIMIZE'))
+    workers = current_app.config.get('CROSSWORD_PORTFOLIO_WORKERS') or 0
+
+    # Streaming: the first word_count words are laid out while the rest of the
+    # response is still arriving (not in optimize mode, which wants a full search)
+    streamed = []
+    incremental = None
+    if not (from_cache or local) and current_app.config.get('CROSSWORD_STREAMING') and not optimize:
+        incremental = CrosswordGenerator([], grid_size=CrosswordGenerator.MAX_GRID_SIZE, strategy=strategy)
+
+    def on_pair(word, _definition):
+        if len(streamed) < word_count and word not in streamed:
+            streamed.append(word)
+            incremental.add_word(word)
+
+    if local:
+        pairs, error = _bank_word_pairs(topic, surplus_count)
+        if error:
+            return None, error
+    elif from_cache:
+        pairs = cached_pairs
+    else:
+        pairs, error = _fetch_word_pairs(prompt, on_pair if incremental else None, usage)
+        if error and current_app.config.get('WORD_BANK_FALLBACK'):
+            # Keep serving puzzles while the LLM is failing, from the local word bank
+            bank_pairs, _ = _bank_word_pairs(topic, surplus_count)
+            if bank_pairs:
+                print(f"Word generation failed; using {len(bank_pairs)} words from the local word bank")
+                pairs, error, local = bank_pairs, None, True
+                streamed.clear()
+        if error:
+            return None, error
+        if word_cache and not local:
+            word_cache.put(topic, level, pairs)
+    if word_cache and not streamed:
+        pairs = word_cache.sample(pairs, surplus_count)
+    definitions = {w: d for w, d in pairs}
+
+    # Filter out words that are too long for the largest grid the generator will try
+    max_word_length = CrosswordGenerator.MAX_GRID_SIZE
+    candidates = list(dict.fromkeys(w for w, _ in pairs if len(w) <= max_word_length))
+    valid_words = streamed or CrosswordGenerator.select_words(candidates, word_count)
+    chosen = set(valid_words)
+    spares = [w for w in candidates if w not in chosen][:surplus_count - len(valid_words)]
+
+    print(f"Generated {len(pairs)} word pairs, {len(valid_words)} valid words after filtering")
+    print(f"Valid words: {valid_words[:10]}...")  # Print first 10 for debugging
+
+    if not valid_words:
+        return None, (jsonify({'success': False, 'error': strings.MSG_NO_VALID_WORDS_FILTERED}), 502)
+
+    if len(valid_words) < 3:
+        return None, (jsonify({'success': False, 'error': f'{strings.MSG_TOO_FEW_WORDS_PREFIX} ({len(valid_words)}). {strings.MSG_TOO_FEW_WORDS_SUFFIX}'}), 502)
+
+    if streamed and len(incremental.solution_coordinates) == len(valid_words):
+        # Every word found a crossing as it arrived; no search needed
+        incremental.compact()
+        incremental.solved = True
+        generator = incremental
+        success = True
+    elif workers > 1:
+        generator = PortfolioService(workers).solve(valid_words, strategy=strategy, time_limit=time_limit,
+                                                    max_nodes=max_nodes, optimize=optimize)
+        success = generator.solved
+    else:
+        generator = CrosswordGenerator(valid_words, strategy=strategy)
+        success = generator.solve(time_limit=time_limit, max_nodes=max_nodes, optimize=optimize)
+    print(f"Crossword search stats: {generator.stats}")
+
+    if not success and spares:
+        # Drop the words that did not fit and place spare candidates in their place
+        for word in spares:
+            if len(generator.solution_coordinates) >= len(valid_words):
+                break
+            generator.add_word(word)
+        placed_words = [word for word, _, _, _ in generator.solution_coordinates]
+        print(f"Replaced {len(set(valid_words) - set(placed_words))} unplaced words with spares")
+        if len(placed_words) >= len(valid_words):
+            valid_words = placed_words
+            success = generator.solved = True
+
+    if not success:
+        # The generator keeps the best partial layout it found
+        placed_count = len(generator.solution_coordinates)
+        print(f"Crossword generation incomplete: placed {placed_count}/{len(valid_words)} words")
+
+        # Serve the partial grid as long as at least half of the words made it in
+        min_required = max(3, len(valid_words) // 2)
+        if placed_count < min_required:
+            return None, (jsonify({
+                'success': False,
+                'error': strings.MSG_CROSSWORD_FAIL_TOTAL.format(placed_count=placed_count, total_words=len(valid_words))
+            }), 500)
+        print(f"Partial success: {placed_count} words placed (minimum: {min_required})")
+
+    return {
+        'generator': generator,
+        'success': success,
+        'valid_words': valid_words,
+        'definitions': definitions,
+        'prompt': prompt,
+        'from_cache': from_cache,
+        'source': 'local' if local else 'llm',
+        'usage': usage,
+    }, None
+
+
+def produce_pool_puzzle(topic: str, level: str):
+    """Puzzle pool producer: a fresh puzzle for (topic, level), or None if none could be built."""
+    puzzle, _ = _build_puzzle(topic, level)
+    return puzzle
+
+
 @puzzle_bp.route('/generate-crossword', methods=['POST'])
 def generate_crossword():
     """
@@ -85,6 +342,20 @@ def generate_crossword():
               description: The desired difficulty level, which determines the number of words.
               enum: ['easy', 'medium', 'hard']
               default: 'easy'
+            format:
+              type: string
+              description: >
+                Response layout. 'full' sends the whole board; 'cropped' crops it to the
+                placed words; 'sparse' omits the grid so the client rebuilds it from the words.
+              enum: ['full', 'cropped', 'sparse']
+              default: 'full'
+            source:
+              type: string
+              description: >
+                Where the words come from: 'llm' asks Gemini (or uses the word cache or puzzle pool);
+                'local' draws them from the server's word bank without any network call.
+                Defaults to the server's WORD_SOURCE setting.
+              enum: ['llm', 'local']
     security:
       - bearerAuth: []
     responses:
@@ -102,7 +373,7 @@ def generate_crossword():
                 type: array
                 items:
                   type: string
-              description: The 2D array representing the crossword grid.
+              description: The 2D array representing the crossword grid (cropped for 'cropped', absent for 'sparse').
             words:
               type: array
               items:
@@ -121,6 +392,31 @@ def generate_crossword():
             total_words: { type: integer }
             placed_words: { type: integer }
             grid_size: { type: integer }
+            format:
+              type: string
+              description: (cropped/sparse only) The layout of this response.
+            format_version: { type: integer }
+            origin:
+              type: object
+              description: (cropped/sparse only) Position of the cropped area on the full board.
+              properties:
+                row: { type: integer }
+                col: { type: integer }
+            rows: { type: integer }
+            cols: { type: integer }
+            partial:
+              type: boolean
+              description: True when the search budget ran out and only some of the words were placed.
+            cached:
+              type: boolean
+              description: True when the words came from the topic word-list cache or puzzle pool instead of the LLM.
+            pooled:
+              type: boolean
+              description: True when a pre-generated puzzle was served from the puzzle pool.
+            source:
+              type: string
+              enum: ['llm', 'local']
+              description: The word source actually used; 'local' also when the LLM failed and the word bank stood in.
             daily:
               type: object
               description: (Authenticated users only) Daily usage statistics.
@@ -134,173 +430,83 @@ def generate_crossword():
         description: Internal server error, such as a failure in the crossword generation logic.
       502:
         description: The upstream word generation service is unavailable or returned an error.
+      503:
+        description: The upstream word generation service failed repeatedly and calls to it are paused briefly.
     """
     try:
         data = flask_request.get_json() or {}
 
         topic = data.get('topic', 'JavaScript')
-        word_count = DIFF_LEVELS.get((data.get('difficulty', 'easy') or 'easy').lower(), 10)
+        response_format = (data.get('format') or 'full').strip().lower()
+        if response_format not in RESPONSE_FORMATS:
+            response_format = 'full'
+        difficulty = (data.get('difficulty', 'easy') or 'easy').lower()
+        source = (data.get('source') or current_app.config.get('WORD_SOURCE') or 'llm').strip().lower()
+        if source not in ('llm', 'local'):
+            source = 'llm'
 
         # Enforce per-user daily free limit (DB-based); guests are not enforced
+        quotas = current_app.extensions.get('quota')
+        quota = None
         try:
             verify_jwt_in_request(optional=True)
             username = get_jwt_identity()
-            user = User.query.filter_by(username=username).first() if username else None
-            if user:
-                # Determine limit: per-user quota overrides global setting
-                try:
-                    uq = UserQuota.query.filter_by(user_id=user.id).first()
-                except Exception:
-                    uq = None
-                if uq and isinstance(getattr(uq, 'daily_limit', None), int):
-                    daily_limit = int(uq.daily_limit)
-                else:
-                    s = AppSetting.query.filter_by(key='DAILY_FREE_LIMIT').first()
-                    try:
-                        daily_limit = int((s.value if s else str(DEFAULT_DAILY_FREE_LIMIT)) or str(DEFAULT_DAILY_FREE_LIMIT))
-                    except Exception:
-                        daily_limit = DEFAULT_DAILY_FREE_LIMIT
-
-                # Count today's API calls to /generate-crossword endpoint
-                now = datetime.now()
-                start = datetime(now.year, now.month, now.day, 0, 0, 0)
-
-                # Get the ApiUsage record for this user and endpoint
-                api_usage_record = ApiUsage.query.filter_by(
-                    user_id=user.id,
-                    endpoint='/api/v1/generate-crossword'
-                ).first()
-
-                # For simplicity, use the count from ApiUsage as daily usage
-                # Note: This counts all-time usage, not just today
-                # A better approach would store daily reset timestamps
-                used_today_before = api_usage_record.count if api_usage_record else 0
-                if used_today_before >= daily_limit:
-                    return jsonify({
-                        'success': False,
-                        'error': strings.MSG_DAILY_LIMIT_REACHED,
-                        'daily': {
-                            'limit': int(daily_limit),
-                            'used': int(used_today_before),
-                            'remaining': 0
-                        }
-                    }), 429
+            quota = quotas.check(username, GENERATE_ENDPOINT) if quotas and username else None
+            # Today's calls come from the user_daily_usage rollup (UTC days)
+            if quota and quota.used >= quota.limit:
+                return jsonify({
+                    'success': False,
+                    'error': strings.MSG_DAILY_LIMIT_REACHED,
+                    'daily': quota.daily()
+                }), 429
         except Exception:
             # If anything fails here, do not block puzzle generation
-            pass
-
-        # Use a more detailed, multi-line prompt to guide the LLM.
-        prompt = f"""Generate a list of {word_count} vacabularies about {topic}. The list must be suitable for creating an interlocking crossword puzzle.
-Do not use bold (**), punctuation marks, or formatting other than the pattern WORD - description.
-Provide the output in the format:
-WORD - Clue"""
-        t0 = datetime.utcnow()
-        try:
-            results = generate_words(prompt)
-        except Exception as e:
-            print(f"Error calling word generation API: {e}")
-            error_msg = str(e)
-            if "timeout" in error_msg.lower() or "connection" in error_msg.lower():
-                return jsonify({'success': False, 'error': strings.MSG_GEN_SERVICE_CONNECTION_FAIL}), 502
-            return jsonify({'success': False, 'error': f'{strings.MSG_GEN_SERVICE_FAIL}: {error_msg}'}), 502
-
-        if not results or len(results) == 0:
-            print("Word generation API returned empty results")
-            return jsonify({'success': False, 'error': strings.MSG_GEN_SERVICE_EMPTY}), 502
-
-        pairs = []
-        for item in results:
-            try:
-                # Ensure item is a tuple/list with at least 3 elements
-                if not isinstance(item, (tuple, list)) or len(item) < 3:
-                    continue
-                
-                _, raw_word, definition = item
-                
-                # Skip error responses from the API
-                if raw_word == "Error" or (isinstance(definition, str) and definition.startswith("{")):
-                    print(f"Skipping error response: {item}")
-                    continue
-                
-                # Ensure raw_word is a string
-                if not isinstance(raw_word, str):
-                    continue
-                
-                # Apply the cleaning function here
-                cleaned_word = _clean_llm_term(raw_word)
-                
-                # Only add the pair if the cleaned word is not empty and has reasonable length
-                if cleaned_word and len(cleaned_word) > 0 and len(cleaned_word) <= 30:
-                    pairs.append((cleaned_word, (definition or '').strip()))
-            except (ValueError, TypeError, IndexError) as e:
-                # Log the error for debugging but continue processing
-                print(f"Error processing word item: {item}, error: {e}")
-                continue
-            except Exception as e:
-                # Catch any other unexpected errors
-                print(f"Unexpected error processing word item: {item}, error: {e}")
-                continue
-
-        if not pairs:
-            return jsonify({'success': False, 'error': strings.MSG_GEN_FAILED}), 502
-
-        words = [w for w, _ in pairs]
-        definitions = {w: d for w, d in pairs}
-
-        # Filter out words that are too long for the grid (grid_size is 30 by default)
-        max_word_length = 30
-        valid_words = [w for w in words if len(w) <= max_word_length]
-        
-        print(f"Generated {len(pairs)} word pairs, {len(valid_words)} valid words after filtering")
-        print(f"Valid words: {valid_words[:10]}...")  # Print first 10 for debugging
-        
-        if not valid_words:
-            return jsonify({'success': False, 'error': strings.MSG_NO_VALID_WORDS_FILTERED}), 502
-
-        if len(valid_words) < 3:
-            return jsonify({'success': False, 'error': f'{strings.MSG_TOO_FEW_WORDS_PREFIX} ({len(valid_words)}). {strings.MSG_TOO_FEW_WORDS_SUFFIX}'}), 502
-
-        generator = CrosswordGenerator(valid_words)
-        success = generator.solve()
-
-        if not success:
-            placed_count = len(generator.solution_coordinates)
-            print(f"Crossword generation failed: placed {placed_count}/{len(valid_words)} words")
-            
-            # If we placed at least 50% of words, consider it a partial success
-            # But for now, we'll still return an error to maintain quality
-            min_required = max(3, len(valid_words) // 2)
-            if placed_count >= min_required:
-                print(f"Partial success: {placed_count} words placed (minimum: {min_required})")
-                # Continue with partial grid - this is acceptable
-                # But we need to update the logic to handle this
-                # For now, we'll still fail but with a more helpful message
-                return jsonify({
-                    'success': False, 
-                    'error': strings.MSG_CROSSWORD_FAIL_PARTIAL.format(placed_count=placed_count, total_words=len(valid_words))
-                }), 500
-            else:
-                return jsonify({
-                    'success': False, 
-                    'error': strings.MSG_CROSSWORD_FAIL_TOTAL.format(placed_count=placed_count, total_words=len(valid_words))
-                }), 500
+            db.session.rollback()
+
+        # Popular (topic, difficulty) pairs may have a puzzle ready in the pool
+        level = difficulty if difficulty in DIFF_LEVELS else 'easy'
+        pool = current_app.extensions.get('puzzle_pool')
+        puzzle = pool.take(topic, level) if pool and source == 'llm' else None
+        pooled = puzzle is not None
+        if not pooled:
+            puzzle, error = _build_puzzle(topic, level, source)
+            if error:
+                return error
+        definitions = puzzle['definitions']
+        valid_words = puzzle['valid_words']
+        generator = puzzle['generator']
+        success = puzzle['success']
+        from_cache = puzzle['from_cache']
+        # Tokens Gemini reported for this request's own call; a pooled puzzle's
+        # call was made by the pool, and cache hits and local words make none
+        tokens_used = {} if pooled else puzzle['usage']
 
         used_words = [word for word, _, _, _ in generator.solution_coordinates]
         size = generator.grid_size
-        grid = generator.grid
 
-        # Validate grid format - ensure it's a 2D list
-        if not grid or not isinstance(grid, list):
-            print(f"Invalid grid format: {type(grid)}")
-            return jsonify({'success': False, 'error': strings.MSG_INVALID_GRID_FORMAT}), 500
-        
-        # Ensure grid cells are strings (convert empty strings to empty strings for JSON)
-        grid_serializable = []
-        for row in grid:
-            if not isinstance(row, list):
-                print(f"Invalid grid row format: {type(row)}")
-                return jsonify({'success': False, 'error': strings.MSG_INVALID_GRID_ROW_FORMAT}), 500
-            grid_serializable.append([str(cell) if cell else '' for cell in row])
+        # Coordinates are reported relative to the bounding box unless the full board is sent
+        box = generator.bounding_box() if response_format != 'full' else None
+        if box is not None:
+            top, left, bottom, right = box
+        else:
+            top, left, bottom, right = 0, 0, size - 1, size - 1
+
+        grid_serializable = None
+        if response_format != 'sparse':
+            grid = generator.grid
+
+            # Validate grid format - ensure it's a 2D list
+            if not grid or not isinstance(grid, list):
+                print(f"Invalid grid format: {type(grid)}")
+                return jsonify({'success': False, 'error': strings.MSG_INVALID_GRID_FORMAT}), 500
+
+            # Ensure grid cells are strings (convert empty strings to empty strings for JSON)
+            grid_serializable = []
+            for row in grid[top:bottom + 1]:
+                if not isinstance(row, list):
+                    print(f"Invalid grid row format: {type(row)}")
+                    return jsonify({'success': False, 'error': strings.MSG_INVALID_GRID_ROW_FORMAT}), 500
+                grid_serializable.append([str(cell) if cell else '' for cell in row[left:right + 1]])
 
         # Build words list with validation
         words_list = []
@@ -313,8 +519,8 @@ WORD - Clue"""
                 words_list.append({
                     'word': str(word),
                     'direction': ('across' if (str(direction).upper() == 'H') else 'down'),
-                    'row': int(row),
-                    'col': int(col),
+                    'row': int(row) - top,
+                    'col': int(col) - left,
                     'length': len(str(word))
                 })
             except (ValueError, TypeError, IndexError) as e:
@@ -327,7 +533,10 @@ WORD - Clue"""
 
         # Ensure definitions are JSON serializable (all keys and values should be strings)
         definitions_serializable = {}
+        placed_set = set(used_words)
         for word, definition in definitions.items():
+            if word not in placed_set:
+                continue
             if isinstance(word, str) and isinstance(definition, str):
                 definitions_serializable[word] = definition
             else:
@@ -335,79 +544,66 @@ WORD - Clue"""
 
         response = {
             'success': True,
-            'grid': grid_serializable,
             'words': words_list,
             'definitions': definitions_serializable,
             'total_words': len(valid_words),
             'placed_words': len(used_words),
-            'grid_size': size
+            'grid_size': size,
+            'partial': not success,
+            'cached': from_cache or pooled,
+            'pooled': pooled,
+            'source': puzzle['source'],
         }
+        if grid_serializable is not None:
+            response['grid'] = grid_serializable
+        if response_format != 'full':
+            response['format'] = response_format
+            response['format_version'] = RESPONSE_FORMAT_VERSION
+            response['origin'] = {'row': top, 'col': left}
+            response['rows'] = bottom - top + 1
+            response['cols'] = right - left + 1
         
         print(f"Response prepared: {len(words_list)} words, grid size {size}x{size}, {len(definitions_serializable)} definitions")
 
         # Optional usage + token tracking if user is authenticated
-        try:
-            verify_jwt_in_request(optional=True)
-            username = get_jwt_identity()
-            if username:
-                user = User.query.filter_by(username=username).first()
-                # Increment usage first
-                usage.increment(username, '/api/v1/generate-crossword')
-
-                # Compute daily info using ApiUsage count
-                daily_limit = int((AppSetting.query.filter_by(key='DAILY_FREE_LIMIT').first() or type('X',(object,),{'value':'20'})()).value)
-                used_today_before = 0
-                if user:
-                    # Get the ApiUsage record for this user and endpoint
-                    api_usage_record = ApiUsage.query.filter_by(
-                        user_id=user.id,
-                        endpoint='/api/v1/generate-crossword'
-                    ).first()
-                    # The count was just incremented above, so it already includes this request
-                    used_today_before = api_usage_record.count if api_usage_record else 0
-                used_after = used_today_before
-                response['daily'] = {
-                    'limit': daily_limit,
-                    'used': used_after,
-                    'remaining': max(0, daily_limit - used_after)
-                }
-
-                # Compute rough token usage
-                prompt_tokens = estimate_tokens(prompt)
-                # Build a completion text approximation using parsed definitions
-                try:
-                    completion_text = '\n'.join([f"{w}: {definitions.get(w, '')}" for w in valid_words])
-                except Exception:
-                    completion_text = ''
-                completion_tokens = estimate_tokens(completion_text)
-                total_tokens = prompt_tokens + completion_tokens
+        if quota:
+            try:
+                prompt_tokens = tokens_used.get('prompt_tokens', 0)
+                completion_tokens = tokens_used.get('completion_tokens', 0)
+                total_tokens = tokens_used.get('total_tokens', 0)
 
                 # Persist a lightweight GameSession row so that daily usage
                 # can be computed from the database (used by /usage/me, admin, etc.).
+                # It is committed together with the usage increment.
+                session = GameSession(
+                    user_id=quota.user_id,
+                    topic=topic,
+                    difficulty=(data.get('difficulty') or 'easy'),
+                    model=('pool' if pooled else 'cache' if from_cache
+                           else 'local' if puzzle['source'] == 'local' else 'llm:newbio'),
+                    tokens_prompt=int(prompt_tokens or 0),
+                    tokens_completion=int(completion_tokens or 0),
+                    tokens_total=int(total_tokens or 0),
+                    words_count=int(len(valid_words)),
+                    placed_words=int(len(used_words)),
+                    grid_size=int(size),
+                    status=('completed' if success else 'partial'),
+                )
                 try:
-                    session = GameSession(
-                        user_id=user.id,
-                        topic=topic,
-                        difficulty=(data.get('difficulty') or 'easy'),
-                        model='llm:newbio',
-                        tokens_prompt=int(prompt_tokens or 0),
-                        tokens_completion=int(completion_tokens or 0),
-                        tokens_total=int(total_tokens or 0),
-                        words_count=int(len(valid_words)),
-                        placed_words=int(len(used_words)),
-                        grid_size=int(size),
-                        status='completed',
-                    )
+                    used_after = quotas.record(quota.user_id, GENERATE_ENDPOINT, tokens=total_tokens, commit=False)
                     db.session.add(session)
                     db.session.commit()
                 except Exception as se:
-                    # Do not fail the request if logging the session fails
+                    # Do not fail the request if logging the session fails; still count the call
                     db.session.rollback()
                     print(f'Failed to record GameSession: {se}')
-        except Exception as e:
-            import traceback
-            print(f"[WARNING] Failed to track daily usage for authenticated user: {e}")
-            traceback.print_exc()
+                    used_after = quotas.record(quota.user_id, GENERATE_ENDPOINT, tokens=total_tokens)
+                # The count includes this request
+                response['daily'] = quota.daily(used_after)
+            except Exception as e:
+                import traceback
+                print(f"[WARNING] Failed to track daily usage for authenticated user: {e}")
+                traceback.print_exc()
 
         return jsonify(response)
     except Exception as e:
@@ -539,21 +735,22 @@ def get_saved_games():
     """
     try:
         username = get_jwt_identity()
-        user = User.query.filter_by(username=username).first()
-        if not user:
-            return jsonify({'success': False, 'error': strings.MSG_USER_NOT_FOUND}), 404
-
-        # Fetch the first 3 saved games, ordered by when they were saved
-        saved_games = SavedGame.query.filter_by(user_id=user.id).order_by(SavedGame.id.asc()).limit(3).all()
-
-        games_summary = []
-        for game in saved_games:
-            games_summary.append({
-                'id': game.id,
-                'topic': game.topic,
-                'difficulty': game.difficulty,
-                'started_at': game.started_at.isoformat()
-            })
+        with read_session() as s:
+            user = s.query(User).filter_by(username=username).first()
+            if not user:
+                return jsonify({'success': False, 'error': strings.MSG_USER_NOT_FOUND}), 404
+
+            # Fetch the first 3 saved games, ordered by when they were saved
+            saved_games = s.query(SavedGame).filter_by(user_id=user.id).order_by(SavedGame.id.asc()).limit(3).all()
+
+            games_summary = []
+            for game in saved_games:
+                games_summary.append({
+                    'id': game.id,
+                    'topic': game.topic,
+                    'difficulty': game.difficulty,
+                    'started_at': game.started_at.isoformat()
+                })
 
         return jsonify({'success': True, 'saved_games': games_summary})
     except Exception as e:
@@ -64,6 +64,24 @@ def all_usage():
         enum: [all, today]
         default: all
         description: Filter usage data for all time or just for the current day.
+      - name: sort
+        in: query
+        type: string
+        enum: [total_calls, tokens_total, games_count, username]
+        default: total_calls
+      - name: order
+        in: query
+        type: string
+        enum: [asc, desc]
+        default: desc
+      - name: limit
+        in: query
+        type: integer
+        description: Page size. All users are returned when omitted.
+      - name: offset
+        in: query
+        type: integer
+        default: 0
     responses:
       200:
         description: All usage summaries retrieved successfully.
@@ -72,6 +90,13 @@ def all_usage():
           properties:
             success:
               type: boolean
+            total:
+              type: integer
+              description: Number of users across all pages (only with limit).
+            limit:
+              type: integer
+            offset:
+              type: integer
             results:
               type: array
               items:
@@ -98,5 +123,14 @@ def all_usage():
     range_opt = (request.args.get('range') or 'all').strip().lower()
     if range_opt not in ('all','today'):
         range_opt = 'all'
-    results = usage.get_all_summaries(range_opt)
-    return jsonify({ 'success': True, 'results': results })
+    sort = (request.args.get('sort') or 'total_calls').strip().lower()
+    order = 'asc' if (request.args.get('order') or '').strip().lower() == 'asc' else 'desc'
+    limit = request.args.get('limit', type=int)
+    offset = max(0, request.args.get('offset', default=0, type=int))
+    results = usage.get_all_summaries(range_opt, limit=limit, offset=offset, sort=sort, order=order)
+    response = { 'success': True, 'results': results }
+    if limit is not None:
+        response['total'] = usage.count_summaries()
+        response['limit'] = max(0, limit)
+        response['offset'] = offset
+    return jsonify(response)
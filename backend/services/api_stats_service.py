@@ -0,0 +1,106 @@
+import atexit
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Tuple
+
+from models import ApiStatistic
+from utils.db_admin import admin_session_scope
+from utils.db_upsert import upsert_add
+
+
+Key = Tuple[str, str]
+
+
+class ApiStatsRecorder:
+    """Counts API calls per (method, endpoint) in memory and writes them in batches.
+
+    ``record()`` only bumps an in-process counter. A background thread
+    flushes the accumulated deltas every ``flush_interval`` seconds, or as
+    soon as ``flush_events`` calls are pending, with one bulk upsert
+    (``count = count + delta``). Whatever is left is flushed when the
+    process exits. Deltas from a failed flush are kept for the next one.
+    """
+
+    def __init__(self, flush_interval: float = 5.0, flush_events: int = 500):
+        self.flush_interval = max(0.1, float(flush_interval))
+        self.flush_events = max(1, int(flush_events))
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Counter = Counter()
+        self._pending_total = 0
+        self._wake = threading.Event()
+        self._owner_pid = None
+        self.recorded = 0
+        self.flushes = 0
+        self.failures = 0
+
+    def record(self, method: str, endpoint: str) -> None:
+        self._ensure_thread()
+        with self._lock:
+            self._pending[(method, endpoint[:128])] += 1
+            self._pending_total += 1
+            self.recorded += 1
+            full = self._pending_total >= self.flush_events
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Writes the pending counts now; returns how many calls were written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, Counter()
+                self._pending_total = 0
+            if not batch:
+                return 0
+            try:
+                self._write(batch)
+            except Exception as e:
+                print(f"Error saving API call stats: {e}")
+                with self._lock:
+                    self.failures += 1
+                    self._pending.update(batch)
+                    self._pending_total += sum(batch.values())
+                return 0
+            with self._lock:
+                self.flushes += 1
+            return sum(batch.values())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'recorded': self.recorded,
+                'pending': self._pending_total,
+                'flushes': self.flushes,
+                'failures': self.failures,
+            }
+
+    def _ensure_thread(self) -> None:
+        # Threads do not survive a fork, so every worker process starts its own
+        with self._lock:
+            if self._owner_pid == os.getpid():
+                return
+            self._owner_pid = os.getpid()
+            # Counts inherited from the parent were already counted there
+            self._pending = Counter()
+            self._pending_total = 0
+        threading.Thread(target=self._run, name='api-stats-flush', daemon=True).start()
+        atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    @staticmethod
+    def _write(batch: Counter) -> None:
+        table = ApiStatistic.__table__
+        now = datetime.utcnow()
+        rows = [
+            {'method': method, 'endpoint': endpoint, 'count': delta, 'recorded_at': now}
+            for (method, endpoint), delta in batch.items()
+        ]
+        with admin_session_scope() as s:
+            upsert_add(s, table, rows, keys=('method', 'endpoint'), counters=('count',))
@@ -0,0 +1,146 @@
+import multiprocessing
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+
+from crossword_grid_generator import CrosswordGenerator
+
+
+_lock = threading.Lock()
+_executor: Optional[ProcessPoolExecutor] = None
+_manager = None
+_owner_pid: Optional[int] = None
+
+
+def _run_seed(words, grid_size, strategy, seed, time_limit, max_nodes, stop_event, optimize=False):
+    """Worker entry point: one independently seeded solver run."""
+    random.seed(seed)
+    generator = CrosswordGenerator(words, grid_size=grid_size, strategy=strategy)
+    solved = generator.solve(time_limit=time_limit, max_nodes=max_nodes, stop_event=stop_event, optimize=optimize)
+    return {
+        'solved': solved,
+        'seed': seed,
+        'placements': list(generator.solution_coordinates),
+        'score': generator.score,
+        'cost': generator.cost,
+        'grid_size': generator.grid_size,
+        'stats': generator.stats,
+    }
+
+
+def _get_pool(workers: int):
+    """Return the process-wide executor and manager, (re)creating them after a fork."""
+    global _executor, _manager, _owner_pid
+    with _lock:
+        if _executor is None or _owner_pid != os.getpid():
+            ctx = multiprocessing.get_context('spawn')
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+            _manager = ctx.Manager()
+            _owner_pid = os.getpid()
+        return _executor, _manager
+
+
+def _reset_pool() -> None:
+    global _executor, _manager, _owner_pid
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        if _manager is not None:
+            try:
+                _manager.shutdown()
+            except Exception:
+                pass
+        _executor = _manager = _owner_pid = None
+
+
+class PortfolioService:
+    """Runs several independently seeded generator searches in parallel.
+
+    The first run that places every word wins and the others are told to stop;
+    if none succeeds before the deadline, the best partial layout is used. In
+    optimisation mode every run uses its full budget and the most compact
+    layout wins.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(1, int(workers))
+
+    def solve(self, words: List[str], strategy: str = 'ordered', grid_size: Optional[int] = None,
+              time_limit: Optional[float] = None, max_nodes: Optional[int] = None,
+              optimize: bool = False) -> CrosswordGenerator:
+        """Return a generator laid out with the winning run's placements.
+
+        ``generator.solved`` tells whether every word was placed.
+        """
+        try:
+            executor, manager = _get_pool(self.workers)
+            stop_event = manager.Event()
+            seeds = [random.randrange(2 ** 31) for _ in range(self.workers)]
+            futures = [
+                executor.submit(_run_seed, words, grid_size, strategy, seed, time_limit, max_nodes, stop_event, optimize)
+                for seed in seeds
+            ]
+        except Exception as e:
+            # Broken pool, spawn bootstrap errors (no __main__ guard), IPC failures...
+            print(f"Portfolio pool unavailable, solving in-process: {e!r}")
+            _reset_pool()
+            return self._solve_local(words, strategy, grid_size, time_limit, max_nodes, optimize)
+
+        # Runs stop on their own at time_limit; allow a little slack for IPC
+        deadline = (time.monotonic() + time_limit + 1.0) if time_limit is not None else None
+        results = []
+        pending = set(futures)
+        broken = False
+        try:
+            while pending:
+                timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    try:
+                        results.append(future.result())
+                    except BrokenProcessPool as e:
+                        print(f"Portfolio run failed: {e!r}")
+                        broken = True
+                    except Exception as e:
+                        print(f"Portfolio run failed: {e!r}")
+                if not optimize and any(r['solved'] for r in results):
+                    break
+        except Exception as e:
+            print(f"Portfolio wait failed: {e!r}")
+            broken = True
+        finally:
+            try:
+                stop_event.set()
+            except Exception:
+                # The manager process is gone; runs still stop at their own deadline
+                broken = True
+            for future in pending:
+                future.cancel()
+        if broken:
+            _reset_pool()
+
+        if not results:
+            return self._solve_local(words, strategy, grid_size, time_limit, max_nodes, optimize)
+
+        solved = [r for r in results if r['solved']]
+        if solved:
+            winner = min(solved, key=lambda r: r['cost']) if optimize else solved[0]
+        else:
+            winner = max(results, key=lambda r: r['score'])
+        # Adaptive runs may have settled on different board sizes
+        generator = CrosswordGenerator(words, grid_size=winner['grid_size'], strategy=strategy)
+        generator.load_layout(winner['placements'])
+        generator.stats = dict(winner['stats'], seed=winner['seed'], runs=len(results))
+        generator.solved = winner['solved']
+        return generator
+
+    def _solve_local(self, words, strategy, grid_size, time_limit, max_nodes, optimize) -> CrosswordGenerator:
+        generator = CrosswordGenerator(words, grid_size=grid_size, strategy=strategy)
+        generator.solve(time_limit=time_limit, max_nodes=max_nodes, optimize=optimize)
+        return generator
@@ -0,0 +1,141 @@
+import os
+import queue
+import threading
+from collections import deque
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from services.word_cache_service import normalize_topic
+
+
+Key = Tuple[str, str]
+
+
+class PuzzlePoolService:
+    """Keeps ready-made puzzles for popular (topic, difficulty) pairs.
+
+    ``produce(topic, difficulty)`` builds one puzzle (or returns None) and is
+    called from background threads inside an app context. Each pool is
+    topped up to ``size`` whenever it drops below ``low_watermark``. Pools
+    start with the configured ``topics`` at every difficulty; any other pair
+    requested ``promote_after`` times gets a pool of its own, up to
+    ``max_pools`` in total.
+    """
+
+    def __init__(self, app, produce: Callable[[str, str], Optional[dict]], topics: Iterable[str],
+                 difficulties: Iterable[str], size: int = 5, low_watermark: int = 2, workers: int = 1,
+                 promote_after: int = 3, max_pools: int = 64):
+        self.app = app
+        self.produce = produce
+        self.size = max(1, int(size))
+        self.low_watermark = min(self.size, max(1, int(low_watermark)))
+        self.workers = max(1, int(workers))
+        self.promote_after = max(0, int(promote_after))
+        self.max_pools = max(1, int(max_pools))
+        self._lock = threading.Lock()
+        self._pools: Dict[Key, deque] = {}
+        self._topics: Dict[Key, str] = {}
+        self._demand: Dict[Key, int] = {}
+        self._scheduled = set()
+        self._queue: 'queue.Queue[Key]' = queue.Queue()
+        self._owner_pid: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.produced = 0
+        self.failures = 0
+        for topic in topics:
+            for difficulty in difficulties:
+                self._add_pool(topic, difficulty)
+
+    def take(self, topic: str, difficulty: str) -> Optional[dict]:
+        """Pop a ready puzzle, or None on a miss. Either way the pool is topped up in the background."""
+        key = (normalize_topic(topic), difficulty)
+        with self._lock:
+            pool = self._pools.get(key)
+            puzzle = pool.popleft() if pool else None
+            if puzzle is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+                if pool is None and key[0]:
+                    self._demand[key] = self._demand.get(key, 0) + 1
+                    if self._demand[key] >= self.promote_after:
+                        self._add_pool(topic, difficulty)
+        self._refill(key)
+        return puzzle
+
+    def start(self) -> None:
+        """Queue every pool for filling and start the worker threads for this process."""
+        for key in list(self._pools):
+            self._refill(key)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total) if total else 0.0,
+                'produced': self.produced,
+                'failures': self.failures,
+                'size': self.size,
+                'low_watermark': self.low_watermark,
+                'pools': [
+                    {'topic': self._topics[key], 'difficulty': key[1], 'ready': len(pool)}
+                    for key, pool in sorted(self._pools.items())
+                ],
+            }
+
+    def _add_pool(self, topic: str, difficulty: str) -> None:
+        """Start pooling a pair; the caller holds the lock or is the constructor."""
+        key = (normalize_topic(topic), difficulty)
+        if not key[0] or key in self._pools or len(self._pools) >= self.max_pools:
+            return
+        self._pools[key] = deque()
+        self._topics[key] = topic
+        self._demand.pop(key, None)
+
+    def _refill(self, key: Key) -> None:
+        self._ensure_workers()
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None or len(pool) >= self.low_watermark or key in self._scheduled:
+                return
+            self._scheduled.add(key)
+        self._queue.put(key)
+
+    def _ensure_workers(self) -> None:
+        # Threads do not survive a fork, so every worker process starts its own
+        with self._lock:
+            if self._owner_pid == os.getpid():
+                return
+            self._owner_pid = os.getpid()
+            # Work queued by the parent process has no thread left to run it
+            self._scheduled.clear()
+            self._queue = queue.Queue()
+        for i in range(self.workers):
+            threading.Thread(target=self._work, name=f'puzzle-pool-{i}', daemon=True).start()
+
+    def _work(self) -> None:
+        while True:
+            key = self._queue.get()
+            with self._lock:
+                topic = self._topics[key]
+            try:
+                with self.app.app_context():
+                    puzzle = self.produce(topic, key[1])
+            except Exception as e:
+                print(f'Puzzle pool refill failed for {key}: {e}')
+                puzzle = None
+            with self._lock:
+                pool = self._pools[key]
+                if puzzle is None:
+                    # Leave the pair for the next take() rather than retrying in a loop
+                    self.failures += 1
+                    self._scheduled.discard(key)
+                    continue
+                pool.append(puzzle)
+                self.produced += 1
+                if len(pool) >= self.size:
+                    self._scheduled.discard(key)
+                    continue
+            self._queue.put(key)
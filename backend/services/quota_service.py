@@ -0,0 +1,188 @@
+import threading
+import time
+from datetime import date, datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import and_, select, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+from extensions import db
+from models import User, UserQuota, AppSetting, ApiUsage, UserDailyUsage
+from utils.db_upsert import upsert_add
+from constants import DEFAULT_DAILY_FREE_LIMIT
+
+
+class QuotaStatus(NamedTuple):
+    user_id: int
+    limit: int
+    used: int
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.limit - self.used)
+
+    def daily(self, used: Optional[int] = None) -> dict:
+        used = self.used if used is None else used
+        return {'limit': int(self.limit), 'used': int(used), 'remaining': max(0, int(self.limit) - int(used))}
+
+
+def utc_today() -> date:
+    return datetime.utcnow().date()
+
+
+class QuotaService:
+    """Daily free-limit checks and usage counting per user.
+
+    Limits are per user, not per endpoint: the ``user_daily_usage`` rollup
+    has one row per user and day. The ``endpoint`` argument names the
+    all-time ``ApiUsage`` counter that ``record()`` also bumps, which is
+    what ``check()`` counts if the rollup is unavailable.
+
+    ``check()`` resolves the user id, their quota override and today's call
+    count (from the ``user_daily_usage`` rollup) with a single joined query;
+    the global ``DAILY_FREE_LIMIT`` setting is read at most once per
+    ``ttl_seconds`` per process. ``record()`` bumps the all-time
+    ``ApiUsage`` counter and today's rollup row in the database
+    (``count = count + 1`` and an atomic upsert), so concurrent requests
+    cannot lose an update.
+
+    Admin endpoints that change the setting call ``invalidate()``; other
+    worker processes pick the change up when their cached value expires.
+
+    If the rollup table cannot be read (e.g. it has not been created on an
+    existing database yet), limits fall back to the all-time ``ApiUsage``
+    count for the endpoint, as before the rollup existed.
+    """
+
+    def __init__(self, ttl_seconds: float = 30.0):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._default_limit: Optional[int] = None
+        self._expires = 0.0
+        self._rollup_warned = False
+
+    def _rollup_failed(self, e: Exception) -> None:
+        if not self._rollup_warned:
+            self._rollup_warned = True
+            print(f"user_daily_usage unavailable, falling back to ApiUsage counts: {e}")
+
+    def default_limit(self) -> int:
+        now = time.monotonic()
+        with self._lock:
+            if self._default_limit is not None and now < self._expires:
+                return self._default_limit
+        value = db.session.execute(
+            select(AppSetting.value).where(AppSetting.key == 'DAILY_FREE_LIMIT')
+        ).scalar()
+        try:
+            limit = int(value or DEFAULT_DAILY_FREE_LIMIT)
+        except (TypeError, ValueError):
+            limit = DEFAULT_DAILY_FREE_LIMIT
+        with self._lock:
+            self._default_limit = limit
+            self._expires = now + self.ttl_seconds
+        return limit
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._default_limit = None
+            self._expires = 0.0
+
+    def check(self, username: str, endpoint: str) -> Optional[QuotaStatus]:
+        """The user's daily limit and calls made today, or None for an unknown user."""
+        if not username:
+            return None
+        try:
+            row = db.session.execute(
+                select(User.id, UserQuota.daily_limit, UserDailyUsage.calls)
+                .outerjoin(UserQuota, UserQuota.user_id == User.id)
+                .outerjoin(UserDailyUsage, and_(UserDailyUsage.user_id == User.id, UserDailyUsage.date == utc_today()))
+                .where(User.username == username)
+            ).first()
+        except DBAPIError as e:
+            # Nothing is pending this early in the request, so a plain rollback is safe
+            db.session.rollback()
+            self._rollup_failed(e)
+            row = db.session.execute(
+                select(User.id, UserQuota.daily_limit, ApiUsage.count)
+                .outerjoin(UserQuota, UserQuota.user_id == User.id)
+                .outerjoin(ApiUsage, and_(ApiUsage.user_id == User.id, ApiUsage.endpoint == endpoint))
+                .where(User.username == username)
+            ).first()
+        if row is None:
+            return None
+        user_id, user_limit, used = row
+        limit = int(user_limit) if user_limit is not None else self.default_limit()
+        return QuotaStatus(int(user_id), limit, int(used or 0))
+
+    def record(self, user_id: int, endpoint: str, tokens: int = 0, games: int = 1, commit: bool = True) -> int:
+        """Counts one call: ``endpoint``'s all-time counter and the user's day. Returns today's calls.
+
+        With ``commit=False`` the changes stay in the session so the caller
+        can commit them together with its own writes.
+        """
+        try:
+            count = self.increment(user_id, endpoint, commit=False)
+            today = utc_today()
+            try:
+                # A savepoint, so a missing rollup table does not undo the ApiUsage count
+                with db.session.begin_nested():
+                    upsert_add(
+                        db.session, UserDailyUsage.__table__,
+                        [{'user_id': user_id, 'date': today, 'calls': 1, 'games': int(games),
+                          'tokens': int(tokens or 0), 'updated_at': datetime.utcnow()}],
+                        keys=('user_id', 'date'), counters=('calls', 'games', 'tokens'),
+                    )
+                    # The upserted row stays locked until commit, so this reads our own value
+                    calls = db.session.execute(
+                        select(UserDailyUsage.calls)
+                        .where(UserDailyUsage.user_id == user_id, UserDailyUsage.date == today)
+                    ).scalar()
+            except DBAPIError as e:
+                self._rollup_failed(e)
+                calls = count
+            if commit:
+                db.session.commit()
+            return int(calls or 0)
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def increment(self, user_id: int, endpoint: str, commit: bool = True) -> int:
+        """Adds one call to the user's counter for ``endpoint`` and returns the new count.
+
+        With ``commit=False`` the change stays in the session so the caller
+        can commit it together with its own writes.
+        """
+        try:
+            count = self._bump(user_id, endpoint)
+            if count is None:
+                # First call to this endpoint; a concurrent request may insert the row
+                # first. The savepoint keeps the caller's pending writes if it does.
+                try:
+                    with db.session.begin_nested():
+                        db.session.add(ApiUsage(user_id=user_id, endpoint=endpoint, count=1))
+                    count = 1
+                except IntegrityError:
+                    count = self._bump(user_id, endpoint) or 1
+            if commit:
+                db.session.commit()
+            return count
+        except Exception:
+            db.session.rollback()
+            raise
+
+    @staticmethod
+    def _bump(user_id: int, endpoint: str) -> Optional[int]:
+        where = (ApiUsage.user_id == user_id, ApiUsage.endpoint == endpoint)
+        stmt = update(ApiUsage).where(*where).values(
+            count=ApiUsage.count + 1,
+            last_used_at=db.func.current_timestamp(),
+        )
+        if getattr(db.engine.dialect, 'update_returning', False):
+            return db.session.execute(stmt.returning(ApiUsage.count)).scalar()
+        # MySQL has no UPDATE ... RETURNING; the updated row stays locked until
+        # commit, so reading it back in the same transaction sees our value
+        if not db.session.execute(stmt).rowcount:
+            return None
+        return db.session.execute(select(ApiUsage.count).where(*where)).scalar()
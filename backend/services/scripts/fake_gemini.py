@@ -0,0 +1,139 @@
+"""Minimal stand-in for the Gemini generateContent endpoint, for local testing.
+
+Point the backend at it with GEMINI_BASE_URL=http://127.0.0.1:8089 (any
+GEMINI_API_KEY value works). Every call answers with a numbered
+"WORD - Clue" list of tech terms; --delay-ms and --fail-rate simulate a slow
+or flaky upstream to exercise timeouts, retries and the circuit breaker.
+Streaming calls get one line per server-sent event, --line-delay-ms apart.
+Calls asking for JSON output get a JSON array of {"word", "clue"} objects.
+
+Usage:
+    python services/scripts/fake_gemini.py --port 8089 --delay-ms 200 --fail-rate 0.3
+"""
+import argparse
+import json
+import random
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TERMS = [
+    ('CLOSURE', 'Function bundled with its lexical scope'),
+    ('PROMISE', 'Object representing a future value'),
+    ('CALLBACK', 'Function passed to be invoked later'),
+    ('PROTOTYPE', 'Object other objects inherit from'),
+    ('FUNCTION', 'Reusable block of code'),
+    ('VARIABLE', 'Named storage for a value'),
+    ('ARRAY', 'Ordered list of values'),
+    ('OBJECT', 'Collection of key value pairs'),
+    ('STRING', 'Sequence of characters'),
+    ('BOOLEAN', 'True or false value'),
+    ('ASYNC', 'Keyword for functions returning promises'),
+    ('AWAIT', 'Pauses until a promise settles'),
+    ('EVENT', 'Signal that something happened'),
+    ('SCOPE', 'Region where a name is visible'),
+    ('HOISTING', 'Moving declarations to the top'),
+    ('JSON', 'Text format for structured data'),
+    ('DOM', 'Tree of page elements'),
+    ('AJAX', 'Asynchronous requests from the browser'),
+    ('REGEX', 'Pattern for matching text'),
+    ('MODULE', 'File that exports code'),
+    ('ITERATOR', 'Object producing a sequence'),
+    ('GENERATOR', 'Function that can pause and resume'),
+    ('CLASS', 'Blueprint for objects'),
+    ('METHOD', 'Function attached to an object'),
+    ('BINDING', 'Association of a name with a value'),
+    ('SYMBOL', 'Unique primitive identifier'),
+    ('PROXY', 'Wrapper intercepting object operations'),
+    ('SET', 'Collection of unique values'),
+    ('MAP', 'Keyed collection'),
+    ('NULL', 'Intentional absence of value'),
+    ('UNDEFINED', 'Value of an unassigned variable'),
+    ('TYPEOF', 'Operator reporting a type'),
+    ('SPREAD', 'Expands an iterable in place'),
+    ('FETCH', 'API for network requests'),
+    ('WORKER', 'Script running in a background thread'),
+    ('BUNDLER', 'Tool combining modules into files'),
+    ('TRANSPILER', 'Converts source between language versions'),
+    ('LINTER', 'Tool flagging suspicious code'),
+    ('NODE', 'Server side JavaScript runtime'),
+    ('NPM', 'JavaScript package registry'),
+]
+
+
+class Handler(BaseHTTPRequestHandler):
+    options = None
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+        if self.options.delay_ms:
+            time.sleep(self.options.delay_ms / 1000.0)
+        if random.random() < self.options.fail_rate:
+            self._send(503, {'error': {'code': 503, 'message': 'fake upstream failure', 'status': 'UNAVAILABLE'}})
+            return
+        stream = self.path.split('?')[0].endswith(':streamGenerateContent')
+        if not stream and not self.path.endswith(':generateContent'):
+            self._send(404, {'error': {'code': 404, 'message': f'unknown path {self.path}', 'status': 'NOT_FOUND'}})
+            return
+
+        prompt = ' '.join(part.get('text', '') for content in body.get('contents', [])
+                          for part in content.get('parts', []))
+        match = re.search(r'\b(\d+)\b', prompt)
+        count = min(len(TERMS), int(match.group(1))) if match else 20
+        terms = random.sample(TERMS, count)
+        if (body.get('generationConfig') or {}).get('responseMimeType') == 'application/json':
+            items = [json.dumps({'word': word, 'clue': clue}) for word, clue in terms]
+            lines = ['[' + items[0]] + [',' + item for item in items[1:]] + [']'] if items else ['[]']
+        else:
+            lines = [f'{i}. {word} - {clue}\n' for i, (word, clue) in enumerate(terms, 1)]
+        text = ''.join(lines)
+        usage = {
+            'promptTokenCount': len(prompt.split()),
+            'candidatesTokenCount': len(text.split()),
+            'totalTokenCount': len(prompt.split()) + len(text.split()),
+        }
+        if stream:
+            self._send_events([{'candidates': [{'content': {'role': 'model', 'parts': [{'text': line}]}}],
+                                'usageMetadata': usage} for line in lines])
+            return
+        self._send(200, {
+            'candidates': [{'content': {'role': 'model', 'parts': [{'text': text}]}, 'finishReason': 'STOP'}],
+            'usageMetadata': usage,
+        })
+
+    def _send_events(self, payloads):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        for i, payload in enumerate(payloads):
+            if i and self.options.line_delay_ms:
+                time.sleep(self.options.line_delay_ms / 1000.0)
+            self.wfile.write(f'data: {json.dumps(payload)}\r\n\r\n'.encode('utf-8'))
+            self.wfile.flush()
+        self.close_connection = True
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--delay-ms', type=int, default=0, help='wait this long before answering')
+    parser.add_argument('--line-delay-ms', type=int, default=0, help='pause between streamed lines')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='fraction of calls answered with a 503')
+    Handler.options = parser.parse_args(argv)
+    server = ThreadingHTTPServer((Handler.options.host, Handler.options.port), Handler)
+    print(f'Fake Gemini listening on http://{Handler.options.host}:{Handler.options.port}')
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""Import words and clues into the local word bank.
+
+Accepts the JSON layout of data/word_bank.json
+(``{topic: {"tags": [...], "words": {WORD: clue}}}``) or a CSV file with
+``word,clue,topic[,tags]`` columns. Entries replace earlier entries of the
+same topics. The bank lives at WORD_BANK_PATH (default data/word_bank.sqlite).
+
+Usage (from backend/):
+    python services/scripts/import_word_bank.py my_words.json
+    python services/scripts/import_word_bank.py terms.csv --path /srv/crossword/word_bank.sqlite
+"""
+import argparse
+import csv
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Allow running this file directly from repo root or backend/
+BASE = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BASE not in sys.path:
+    sys.path.insert(0, BASE)
+
+from services.word_bank_service import WordBankService, load_seed  # noqa: E402
+
+
+def load_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return [(row['word'], row['clue'], row['topic'], row.get('tags') or '') for row in csv.DictReader(f)]
+
+
+def main(argv=None):
+    load_dotenv()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('source', help='JSON or CSV file to import')
+    parser.add_argument('--path', default=os.getenv('WORD_BANK_PATH') or None, help='word bank file')
+    args = parser.parse_args(argv)
+
+    entries = load_csv(args.source) if args.source.lower().endswith('.csv') else load_seed(args.source)
+    bank = WordBankService(args.path)
+    count = bank.import_entries(entries)
+    print(f"Imported {count} entries into {bank.path} ({bank.stats()['entries']} in total)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,143 +1,153 @@
 from typing import Optional, Dict, List
-from datetime import datetime, timedelta
 
 from extensions import db
-from models import User, ApiUsage, GameSession, UserDailyReset
+from utils.db_read import read_session
+from services.quota_service import utc_today
+from models import User, ApiUsage, GameSession, UserDailyUsage, UserQuota
 from models import AppSetting
 from constants import DEFAULT_DAILY_FREE_LIMIT
 
 
-class UsageService:
-    def _get_user(self, username: str) -> Optional[User]:
-        if not username:
-            return None
-        return User.query.filter_by(username=username).first()
+GENERATE_ENDPOINT = '/api/v1/generate-crossword'
 
-    def increment(self, username: str, endpoint: str) -> None:
-        """Increment usage count for a user on a given endpoint."""
-        user = self._get_user(username)
-        if not user or not endpoint:
-            return
-        usage = ApiUsage.query.filter_by(user_id=user.id, endpoint=endpoint).first()
-        if not usage:
-            usage = ApiUsage(user_id=user.id, endpoint=endpoint, count=1)
-            db.session.add(usage)
-        else:
-            usage.count = (usage.count or 0) + 1
-            # last_used_at auto-updates via onupdate; ensure unit of work notes change
-            usage.last_used_at = datetime.utcnow()
-        db.session.commit()
 
+class UsageService:
     def get_user_summary(self, username: str) -> Dict:
-        user = self._get_user(username)
-        if not user:
-            return { 'total_calls': 0, 'by_endpoint': {}, 'tokens_total': 0, 'games_count': 0 }
-        rows: List[ApiUsage] = ApiUsage.query.filter_by(user_id=user.id).all()
-        by_endpoint = { r.endpoint: int(r.count or 0) for r in rows }
-        total = sum(by_endpoint.values())
-        # Aggregate tokens/games from sessions (best-effort)
-        try:
-            sess_rows: List[GameSession] = GameSession.query.filter_by(user_id=user.id).all()
-            tokens_total = sum(int(getattr(s, 'tokens_total') or 0) for s in sess_rows)
-            games_count = len(sess_rows)
-        except Exception:
-            tokens_total = 0
-            games_count = 0
-        # Fallback: if no sessions recorded, approximate games from endpoint usage
-        if games_count == 0:
-            games_count = int(by_endpoint.get('/api/v1/generate-crossword', 0))
-        # Fallback tokens approximation per game if tokens_total is 0 but we have games
-        if tokens_total == 0 and games_count > 0:
-            tokens_total = int(games_count * 1000)  # coarse approx
-        # Daily free calls using ApiUsage count
-        try:
-            s = AppSetting.query.filter_by(key='DAILY_FREE_LIMIT').first()
-            daily_limit = int((s.value if s else str(DEFAULT_DAILY_FREE_LIMIT)) or str(DEFAULT_DAILY_FREE_LIMIT))
-        except Exception:
-            daily_limit = DEFAULT_DAILY_FREE_LIMIT
-        # Count API calls to /generate-crossword endpoint
-        try:
-            # Get the ApiUsage record for this user and endpoint
-            api_usage_record = ApiUsage.query.filter_by(
-                user_id=user.id,
-                endpoint='/api/v1/generate-crossword'
-            ).first()
-            # Use the total count as daily usage
-            # Note: This counts all-time usage, not just today
-            used_today = api_usage_record.count if api_usage_record else 0
-        except Exception:
-            used_today = 0
-        daily_info = {
-            'limit': int(daily_limit),
-            'used': int(used_today),
-            'remaining': max(0, int(daily_limit) - int(used_today))
-        }
-        return { 'total_calls': int(total), 'by_endpoint': by_endpoint, 'tokens_total': int(tokens_total), 'games_count': int(games_count), 'daily': daily_info }
+        with read_session() as rs:
+            user = rs.query(User).filter_by(username=username).first() if username else None
+            if not user:
+                return { 'total_calls': 0, 'by_endpoint': {}, 'tokens_total': 0, 'games_count': 0 }
+            rows: List[ApiUsage] = rs.query(ApiUsage).filter_by(user_id=user.id).all()
+            by_endpoint = { r.endpoint: int(r.count or 0) for r in rows }
+            total = sum(by_endpoint.values())
+            # Aggregate tokens/games from sessions in SQL (best-effort)
+            try:
+                tokens_total, games_count = rs.query(
+                    db.func.coalesce(db.func.sum(GameSession.tokens_total), 0),
+                    db.func.count(GameSession.id),
+                ).filter(GameSession.user_id == user.id).one()
+                tokens_total, games_count = int(tokens_total or 0), int(games_count or 0)
+            except Exception:
+                tokens_total = 0
+                games_count = 0
+            # Fallback: if no sessions recorded, approximate games from endpoint usage
+            if games_count == 0:
+                games_count = int(by_endpoint.get('/api/v1/generate-crossword', 0))
+            # Daily free calls: per-user quota overrides the global setting
+            try:
+                uq = rs.query(UserQuota.daily_limit).filter_by(user_id=user.id).scalar()
+                if uq is not None:
+                    daily_limit = int(uq)
+                else:
+                    s = rs.query(AppSetting).filter_by(key='DAILY_FREE_LIMIT').first()
+                    daily_limit = int((s.value if s else str(DEFAULT_DAILY_FREE_LIMIT)) or str(DEFAULT_DAILY_FREE_LIMIT))
+            except Exception:
+                daily_limit = DEFAULT_DAILY_FREE_LIMIT
+            # Today's calls to /generate-crossword from the daily rollup (one row lookup)
+            try:
+                used_today = rs.query(UserDailyUsage.calls).filter_by(
+                    user_id=user.id,
+                    date=utc_today()
+                ).scalar() or 0
+            except Exception:
+                # No rollup table yet: the all-time count, as the quota check falls back to
+                used_today = int(by_endpoint.get(GENERATE_ENDPOINT, 0))
+            daily_info = {
+                'limit': int(daily_limit),
+                'used': int(used_today),
+                'remaining': max(0, int(daily_limit) - int(used_today))
+            }
+            return { 'total_calls': int(total), 'by_endpoint': by_endpoint, 'tokens_total': int(tokens_total), 'games_count': int(games_count), 'daily': daily_info }
 
-    def get_all_summaries(self, range_opt: str = 'all') -> List[Dict]:
-        """Return usage summary for all users.
-        range_opt: 'all' | 'today' (UTC)
-        """
-        # Fetch all usage rows and aggregate per user (all-time calls)
-        rows: List[ApiUsage] = ApiUsage.query.all()
-        per_user: Dict[int, Dict] = {}
-        for r in rows:
-            entry = per_user.setdefault(r.user_id, { 'total_calls': 0, 'by_endpoint': {} })
-            entry['by_endpoint'][r.endpoint] = int(entry['by_endpoint'].get(r.endpoint, 0)) + int(r.count or 0)
-            entry['total_calls'] = int(entry['total_calls']) + int(r.count or 0)
+    # Columns /usage/all can be sorted by
+    SUMMARY_SORTS = ('total_calls', 'tokens_total', 'games_count', 'username')
 
-        # Map to usernames
-        users = { u.id: u for u in User.query.filter(User.id.in_(per_user.keys())).all() } if per_user else {}
+    @staticmethod
+    def _summary_query(rs, range_opt: str):
+        """One row per user with ApiUsage rows: id, username, email, total_calls, tokens_total, games_count."""
+        calls = rs.query(
+            ApiUsage.user_id.label('user_id'),
+            db.func.sum(ApiUsage.count).label('total_calls'),
+            db.func.sum(db.case((ApiUsage.endpoint == GENERATE_ENDPOINT, ApiUsage.count), else_=0)).label('generate_calls'),
+        ).group_by(ApiUsage.user_id).subquery()
 
-        # Include token totals/games per user
-        by_user_tokens: Dict[int, int] = {}
-        by_user_games: Dict[int, int] = {}
         if range_opt == 'today':
-            # Today counts: from midnight UTC, and after any reset markers
-            try:
-                today = datetime.utcnow().date()
-                sess_rows: List[GameSession] = GameSession.query.filter(db.func.date(GameSession.started_at) == today).all()
-                # Build reset map: user_id -> reset_at
-                reset_rows: List[UserDailyReset] = UserDailyReset.query.filter_by(date=today).all()
-                reset_map = { r.user_id: r.reset_at for r in reset_rows }
-                for s in sess_rows:
-                    ra = reset_map.get(s.user_id)
-                    if ra and s.started_at <= ra:
-                        continue
-                    by_user_tokens[s.user_id] = int(by_user_tokens.get(s.user_id, 0)) + int(getattr(s, 'tokens_total') or 0)
-                    by_user_games[s.user_id] = int(by_user_games.get(s.user_id, 0)) + 1
-            except Exception:
-                pass
+            # Today's totals are one rollup row per user (UTC day)
+            sessions = rs.query(
+                UserDailyUsage.user_id.label('user_id'),
+                UserDailyUsage.tokens.label('tokens_total'),
+                UserDailyUsage.games.label('games_count'),
+            ).filter(UserDailyUsage.date == utc_today()).subquery('sessions')
         else:
-            try:
-                sess_rows: List[GameSession] = GameSession.query.all()
-                for s in sess_rows:
-                    by_user_tokens[s.user_id] = int(by_user_tokens.get(s.user_id, 0)) + int(getattr(s, 'tokens_total') or 0)
-                    by_user_games[s.user_id] = int(by_user_games.get(s.user_id, 0)) + 1
-            except Exception:
-                pass
+            sessions = rs.query(
+                GameSession.user_id.label('user_id'),
+                db.func.sum(GameSession.tokens_total).label('tokens_total'),
+                db.func.count(GameSession.id).label('games_count'),
+            ).group_by(GameSession.user_id).subquery('sessions')
 
-        result: List[Dict] = []
-        for uid, data in per_user.items():
-            u = users.get(uid)
+        games = db.func.coalesce(sessions.c.games_count, 0)
+        if range_opt != 'today':
             # Fallback derive games from endpoint usage if sessions absent (all-time only)
-            fallback_games = int(data['by_endpoint'].get('/api/v1/generate-crossword', 0))
-            if range_opt == 'today':
-                games = int(by_user_games.get(uid, 0))
-            else:
-                games = int(by_user_games.get(uid, 0) or fallback_games)
-            tokens = int(by_user_tokens.get(uid, 0))
-            if tokens == 0 and games > 0:
-                tokens = int(games * 1000)  # coarse approx
-            result.append({
-                'username': (u.username if u else f'user:{uid}'),
-                'email': (u.email if u else None),
-                'total_calls': int(data['total_calls']),
-                'by_endpoint': data['by_endpoint'],
-                'tokens_total': tokens,
-                'games_count': games,
-            })
-        # Sort desc by total calls
-        result.sort(key=lambda x: x['total_calls'], reverse=True)
-        return result
+            games = db.case((games > 0, games), else_=db.func.coalesce(calls.c.generate_calls, 0))
+        return (
+            rs.query(
+                calls.c.user_id,
+                User.username,
+                User.email,
+                db.func.coalesce(calls.c.total_calls, 0).label('total_calls'),
+                db.func.coalesce(sessions.c.tokens_total, 0).label('tokens_total'),
+                games.label('games_count'),
+            )
+            .select_from(calls)
+            .outerjoin(User, User.id == calls.c.user_id)
+            .outerjoin(sessions, sessions.c.user_id == calls.c.user_id)
+        )
+
+    def get_all_summaries(self, range_opt: str = 'all', limit: Optional[int] = None, offset: int = 0,
+                          sort: str = 'total_calls', order: str = 'desc') -> List[Dict]:
+        """Return usage summary for all users.
+        range_opt: 'all' | 'today' (UTC); tokens and games are counted over the range.
+        Aggregation, sorting (one of SUMMARY_SORTS) and paging run in SQL.
+        """
+        if sort not in self.SUMMARY_SORTS:
+            sort = 'total_calls'
+        with read_session() as rs:
+            query = self._summary_query(rs, range_opt).subquery()
+            key = query.c[sort]
+            tiebreak = query.c.user_id
+            q = rs.query(query).order_by(
+                key.asc() if order == 'asc' else key.desc(),
+                tiebreak.asc(),
+            )
+            if offset:
+                q = q.offset(max(0, int(offset)))
+            if limit is not None:
+                q = q.limit(max(0, int(limit)))
+            rows = q.all()
+
+            # Per-endpoint counts for this page only
+            by_user: Dict[int, Dict[str, int]] = {}
+            if rows:
+                usage_rows = rs.query(ApiUsage.user_id, ApiUsage.endpoint, ApiUsage.count).filter(
+                    ApiUsage.user_id.in_([r.user_id for r in rows])
+                ).all()
+                for uid, endpoint, count in usage_rows:
+                    endpoints = by_user.setdefault(uid, {})
+                    endpoints[endpoint] = int(endpoints.get(endpoint, 0)) + int(count or 0)
+
+            return [
+                {
+                    'username': (r.username if r.username is not None else f'user:{r.user_id}'),
+                    'email': r.email,
+                    'total_calls': int(r.total_calls or 0),
+                    'by_endpoint': by_user.get(r.user_id, {}),
+                    'tokens_total': int(r.tokens_total or 0),
+                    'games_count': int(r.games_count or 0),
+                }
+                for r in rows
+            ]
 
+    def count_summaries(self) -> int:
+        """Number of users get_all_summaries() reports on (users with any API usage)."""
+        with read_session() as rs:
+            return int(rs.query(db.func.count(db.distinct(ApiUsage.user_id))).scalar() or 0)
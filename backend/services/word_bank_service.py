@@ -0,0 +1,144 @@
+import json
+import os
+import random
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from services.word_cache_service import normalize_topic
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+SEED_PATH = os.path.join(DATA_DIR, 'word_bank.json')
+DEFAULT_PATH = os.path.join(DATA_DIR, 'word_bank.sqlite')
+
+# (word, clue, topic, tags)
+Entry = Tuple[str, str, str, str]
+
+
+def load_seed(path: str) -> List[Entry]:
+    """Entries from a word bank JSON file: ``{topic: {"tags": [...], "words": {WORD: clue}}}``."""
+    with open(path, encoding='utf-8') as f:
+        topics = json.load(f)
+    entries = []
+    for topic, spec in topics.items():
+        tags = ' '.join(spec.get('tags') or [])
+        for word, clue in (spec.get('words') or {}).items():
+            entries.append((word, clue, topic, tags))
+    return entries
+
+
+class WordBankService:
+    """Local word source: (word, clue) entries in an SQLite FTS5 index keyed by topic and tags.
+
+    ``request(topic, count)`` answers in the same ``(i, word, definition)``
+    shape as the LLM ``request()``, so the rest of the pipeline treats both
+    alike. The index file is built from the bundled ``data/word_bank.json``
+    the first time it is opened; ``services/scripts/import_word_bank.py``
+    adds more entries.
+    """
+
+    def __init__(self, path: Optional[str] = None, seed_path: Optional[str] = SEED_PATH):
+        self.path = path or DEFAULT_PATH
+        self.seed_path = seed_path
+        self._local = threading.local()
+        self._build_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections may not cross threads or forks, so each thread of each process opens its own
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            self.ensure()
+            conn = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def ensure(self) -> None:
+        """Creates the index from the seed file if it does not exist yet."""
+        if os.path.exists(self.path):
+            return
+        with self._build_lock:
+            if os.path.exists(self.path):
+                return
+            tmp = f'{self.path}.{os.getpid()}.tmp'
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(tmp)
+            try:
+                self._create(conn)
+                if self.seed_path and os.path.exists(self.seed_path):
+                    self._insert(conn, load_seed(self.seed_path))
+                conn.commit()
+            finally:
+                conn.close()
+            os.replace(tmp, self.path)
+            print(f"Built word bank index at {self.path}")
+
+    @staticmethod
+    def _create(conn: sqlite3.Connection) -> None:
+        conn.execute('CREATE VIRTUAL TABLE IF NOT EXISTS entries USING fts5(word UNINDEXED, clue, topic, tags)')
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, entries: Iterable[Entry]) -> int:
+        entries = [(w.strip().upper(), c.strip(), normalize_topic(t), normalize_topic(tags))
+                   for w, c, t, tags in entries if w and w.strip() and c and c.strip()]
+        # Re-importing a topic replaces its words
+        for topic in {e[2] for e in entries}:
+            conn.execute('DELETE FROM entries WHERE topic = ?', (topic,))
+        conn.executemany('INSERT INTO entries (word, clue, topic, tags) VALUES (?, ?, ?, ?)', entries)
+        return len(entries)
+
+    def import_entries(self, entries: Iterable[Entry]) -> int:
+        """Adds (word, clue, topic, tags) entries, replacing earlier entries of the same topics."""
+        self.ensure()
+        conn = sqlite3.connect(self.path)
+        try:
+            self._create(conn)
+            count = self._insert(conn, entries)
+            conn.commit()
+            return count
+        finally:
+            conn.close()
+
+    def lookup(self, topic: str, count: int) -> List[Tuple[str, str]]:
+        """Up to ``count`` (word, clue) pairs for a topic, sampled at random.
+
+        Entries whose topic or tags match a word of ``topic`` come first;
+        entries that only mention it in the clue fill up the rest.
+        """
+        tokens = normalize_topic(topic).split()
+        if not tokens or count <= 0:
+            return []
+        terms = ' OR '.join(f'"{t}"' for t in tokens)
+        conn = self._connect()
+        picked: Dict[str, str] = {}
+        for match in (f'{{topic tags}}: ({terms})', f'clue: ({terms})'):
+            rows = conn.execute('SELECT word, clue FROM entries WHERE entries MATCH ?', (match,)).fetchall()
+            rows = [row for row in rows if row[0] not in picked]
+            for word, clue in random.sample(rows, min(len(rows), count - len(picked))):
+                picked.setdefault(word, clue)
+            if len(picked) >= count:
+                break
+        return list(picked.items())
+
+    def request(self, topic: str, count: int) -> List[Tuple[int, str, str]]:
+        """Like ``request.request`` for the word bank: (i, word, definition) tuples, empty if nothing matches."""
+        try:
+            pairs = self.lookup(topic, count)
+        except sqlite3.Error as e:
+            print(f"Word bank lookup failed: {e}")
+            pairs = []
+        if pairs:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return [(i, word, clue) for i, (word, clue) in enumerate(pairs, 1)]
+
+    def stats(self) -> Dict:
+        try:
+            entries = self._connect().execute('SELECT count(*) FROM entries').fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        return {'path': self.path, 'entries': entries, 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,120 @@
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from extensions import db
+from models import TopicWordList
+
+
+Pair = Tuple[str, str]
+
+
+def normalize_topic(topic: Optional[str]) -> str:
+    """Cache key for a topic: lower-case words joined by single spaces ('  Java  Script!' -> 'java script')."""
+    return ' '.join(re.findall(r'[a-z0-9+#]+', (topic or '').lower()))
+
+
+def _unique(pairs: List[Pair]) -> List[Pair]:
+    """Drop repeated words, keeping the first definition given for each."""
+    unique: Dict[str, str] = {}
+    for word, definition in pairs:
+        unique.setdefault(word, definition)
+    return list(unique.items())
+
+
+class WordCacheService:
+    """Cache of parsed (word, definition) lists per (topic, difficulty).
+
+    Entries live in an in-process LRU for ``ttl_seconds``. With ``use_db``
+    they are also written to the ``topic_word_lists`` table, so a restarted
+    or sibling worker process can pick them up without asking the LLM again.
+    """
+
+    def __init__(self, ttl_seconds: int = 86400, max_entries: int = 256, use_db: bool = False):
+        self.ttl_seconds = max(0, int(ttl_seconds))
+        self.max_entries = max(1, int(max_entries))
+        self.use_db = use_db
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[float, List[Pair]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, topic: str, difficulty: str) -> Optional[List[Pair]]:
+        """Return the cached pairs for a topic, or None when absent or expired."""
+        key = (normalize_topic(topic), difficulty)
+        if not key[0]:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return list(entry[1])
+                del self._entries[key]
+
+        pairs = self._load(key) if self.use_db else None
+        with self._lock:
+            if pairs:
+                self._store(key, pairs, now)
+                self.hits += 1
+            else:
+                self.misses += 1
+        return pairs
+
+    def put(self, topic: str, difficulty: str, pairs: List[Pair]) -> None:
+        """Cache the pairs for a topic."""
+        key = (normalize_topic(topic), difficulty)
+        pairs = _unique(pairs)
+        if not key[0] or not pairs:
+            return
+        with self._lock:
+            self._store(key, pairs, time.monotonic())
+        if self.use_db:
+            self._save(key, pairs)
+
+    @staticmethod
+    def sample(pairs: List[Pair], count: int) -> List[Pair]:
+        """A random subset of ``count`` distinct words, so cached topics still give varied puzzles."""
+        pairs = _unique(pairs)
+        if len(pairs) <= count:
+            return pairs
+        return random.sample(pairs, count)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    def _store(self, key: Tuple[str, str], pairs: List[Pair], now: float) -> None:
+        self._entries[key] = (now + self.ttl_seconds, pairs)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _load(self, key: Tuple[str, str]) -> Optional[List[Pair]]:
+        try:
+            row = TopicWordList.query.filter_by(topic_key=key[0], difficulty=key[1]).first()
+            if not row or row.created_at < datetime.utcnow() - timedelta(seconds=self.ttl_seconds):
+                return None
+            return [(str(w), str(d)) for w, d in (row.pairs_json or [])]
+        except Exception as e:
+            print(f'Word cache lookup failed: {e}')
+            return None
+
+    def _save(self, key: Tuple[str, str], pairs: List[Pair]) -> None:
+        try:
+            row = TopicWordList.query.filter_by(topic_key=key[0], difficulty=key[1]).first()
+            if row is None:
+                row = TopicWordList(topic_key=key[0], difficulty=key[1])
+                db.session.add(row)
+            row.pairs_json = [[w, d] for w, d in pairs]
+            row.created_at = datetime.utcnow()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f'Word cache write failed: {e}')
@@ -21,12 +21,14 @@ MSG_PASSWORD_RESET_SUCCESS = 'Password reset successful. You can now sign in.'
 MSG_DAILY_LIMIT_REACHED = 'Daily free limit reached'
 MSG_GEN_SERVICE_CONNECTION_FAIL = 'Failed to connect to word generation service. Please check your internet connection and try again.'
 MSG_GEN_SERVICE_FAIL = 'Failed to connect to word generation service'
+MSG_GEN_SERVICE_UNAVAILABLE = 'The word generation service is temporarily unavailable. Please try again in a minute.'
 MSG_GEN_SERVICE_EMPTY = 'Word generation API returned no results. The service may be unavailable or the response format was unexpected.'
 MSG_GEN_FAILED = 'Word generation failed'
+MSG_WORD_BANK_NO_MATCH = 'The local word bank has no words for this topic.'
+MSG_WORD_BANK_UNAVAILABLE = 'The local word bank is not available.'
 MSG_NO_VALID_WORDS_FILTERED = 'No valid words after filtering (all words too long)'
 MSG_TOO_FEW_WORDS_PREFIX = 'Too few valid words'
 MSG_TOO_FEW_WORDS_SUFFIX = 'Need at least 3 words to generate a crossword.'
-MSG_CROSSWORD_FAIL_PARTIAL = 'Could only place {placed_count} out of {total_words} words. The crossword generator needs words that can intersect. Try a different topic with more common terms.'
 MSG_CROSSWORD_FAIL_TOTAL = 'Crossword generation failed. Could only place {placed_count} out of {total_words} words. The words may not have enough common letters to intersect. Try a different topic or difficulty.'
 MSG_INVALID_GRID_FORMAT = 'Invalid grid format generated'
 MSG_INVALID_GRID_ROW_FORMAT = 'Invalid grid row format'
@@ -1,6 +1,8 @@
 import os
 import ssl
+import threading
 from contextlib import contextmanager
+from typing import Dict, Optional
 from urllib.parse import urlparse, urlunparse, quote
 
 from sqlalchemy import create_engine
@@ -53,18 +55,73 @@ def _admin_engine_connect_args() -> dict:
     return connect_args
 
 
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int((os.getenv(name) or '').strip() or default)
+    except ValueError:
+        return default
+
+
+def _admin_engine_options() -> dict:
+    """Pool settings for the admin engine from env (DB_ADMIN_POOL_*)."""
+    return {
+        'pool_size': _env_int('DB_ADMIN_POOL_SIZE', 2),
+        'max_overflow': _env_int('DB_ADMIN_MAX_OVERFLOW', 3),
+        'pool_timeout': _env_int('DB_ADMIN_POOL_TIMEOUT', 10),
+        # Recycle before the server (or a proxy) drops idle connections
+        'pool_recycle': _env_int('DB_ADMIN_POOL_RECYCLE', 280),
+        'pool_pre_ping': (os.getenv('DB_ADMIN_POOL_PRE_PING') or 'true').strip().lower() == 'true',
+    }
+
+
+_engine = None
+_engine_pid: Optional[int] = None
+_engine_lock = threading.Lock()
+_engines_created = 0
+
+
 def get_admin_engine():
-    """Create an Engine bound with admin credentials."""
-    url = _build_admin_database_url()
-    connect_args = _admin_engine_connect_args()
-    return create_engine(url, pool_pre_ping=True, connect_args=connect_args)
+    """Process-wide Engine bound with admin credentials, created on first use.
+
+    Connections are pooled and reused across admin_session_scope() calls. A
+    forked worker (gunicorn) drops the pool it inherited, without closing the
+    parent's sockets, and builds its own.
+    """
+    global _engine, _engine_pid, _engines_created
+    pid = os.getpid()
+    if _engine is not None and _engine_pid == pid:
+        return _engine
+    with _engine_lock:
+        if _engine is not None and _engine_pid == pid:
+            return _engine
+        if _engine is not None:
+            _engine.dispose(close=False)
+        url = _build_admin_database_url()
+        connect_args = _admin_engine_connect_args()
+        _engine = create_engine(url, connect_args=connect_args, **_admin_engine_options())
+        _engine_pid = pid
+        _engines_created += 1
+        return _engine
+
+
+def admin_pool_stats() -> Optional[Dict]:
+    """Connection pool counters of this process's admin engine, or None before first use."""
+    engine = _engine
+    if engine is None or _engine_pid != os.getpid():
+        return None
+    pool = engine.pool
+    stats = {'engines_created': _engines_created, 'status': pool.status()}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    return stats
 
 
 @contextmanager
 def admin_session_scope():
     """Provide a transactional scope around a series of operations using admin DB creds."""
-    engine = get_admin_engine()
-    session = Session(bind=engine, future=True)
+    session = Session(bind=get_admin_engine(), future=True)
     try:
         yield session
         session.commit()
@@ -73,8 +130,3 @@ def admin_session_scope():
         raise
     finally:
         session.close()
-        try:
-            engine.dispose()
-        except Exception:
-            pass
-
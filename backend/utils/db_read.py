@@ -0,0 +1,53 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Optional
+
+from flask import current_app
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from extensions import db
+
+
+REPLICA_BIND = 'replica'
+
+# monotonic time until which the replica is skipped after a failed connect
+_replica_down_until = 0.0
+
+
+def _replica_session() -> Optional[Session]:
+    global _replica_down_until
+    engine = db.engines.get(REPLICA_BIND)
+    if engine is None or time.monotonic() < _replica_down_until:
+        return None
+    session = Session(bind=engine, future=True)
+    try:
+        session.connection()
+    except DBAPIError as e:
+        session.close()
+        _replica_down_until = time.monotonic() + current_app.config.get('DB_REPLICA_RETRY_SECONDS', 30)
+        print(f"Read replica unavailable, using the primary: {e}")
+        return None
+    return session
+
+
+@contextmanager
+def read_session(primary: Optional[Callable[[], ContextManager[Session]]] = None):
+    """Session for read-only queries.
+
+    Uses the ``replica`` bind (DATABASE_REPLICA_URL) when one is configured
+    and reachable. Otherwise the session comes from ``primary()`` if given
+    (e.g. ``admin_session_scope``), else ``db.session``. Replica reads may
+    lag the primary slightly.
+    """
+    session = _replica_session()
+    if session is not None:
+        try:
+            yield session
+        finally:
+            session.close()
+    elif primary is not None:
+        with primary() as s:
+            yield s
+    else:
+        yield db.session
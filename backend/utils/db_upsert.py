@@ -0,0 +1,42 @@
+from typing import Dict, Iterable, List
+
+from sqlalchemy import Table, insert, update
+
+
+def upsert_add(session, table: Table, rows: List[Dict], keys: Iterable[str], counters: Iterable[str]) -> None:
+    """Inserts ``rows``; where a row with the same ``keys`` exists, adds to its ``counters`` instead.
+
+    Other columns of an existing row are overwritten with the new values.
+    ``keys`` must be covered by a unique constraint. Runs as one statement on
+    MySQL (ON DUPLICATE KEY UPDATE), SQLite and PostgreSQL (ON CONFLICT), and
+    as UPDATE-then-INSERT per row elsewhere.
+    """
+    if not rows:
+        return
+    keys, counters = list(keys), list(counters)
+    others = [c for c in rows[0] if c not in keys and c not in counters]
+    dialect = session.get_bind().dialect.name
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert as mysql_insert
+        stmt = mysql_insert(table).values(rows)
+        values = {c: table.c[c] + stmt.inserted[c] for c in counters}
+        values.update({c: stmt.inserted[c] for c in others})
+        session.execute(stmt.on_duplicate_key_update(**values))
+    elif dialect in ('postgresql', 'sqlite'):
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table).values(rows)
+        values = {c: table.c[c] + stmt.excluded[c] for c in counters}
+        values.update({c: stmt.excluded[c] for c in others})
+        session.execute(stmt.on_conflict_do_update(index_elements=[table.c[k] for k in keys], set_=values))
+    else:
+        for row in rows:
+            values = {c: table.c[c] + row[c] for c in counters}
+            values.update({c: row[c] for c in others})
+            updated = session.execute(
+                update(table).where(*(table.c[k] == row[k] for k in keys)).values(values)
+            ).rowcount
+            if not updated:
+                session.execute(insert(table).values(row))
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: coalescing stays per process
+    fcntl = None
+
+
+class _Call:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one.
+
+    The first caller for a key runs ``fn``; callers arriving while it runs
+    wait and receive the same result (or exception).
+
+    With ``lock_dir`` the leader also takes an exclusive file lock for the key,
+    so leaders in other processes on the host queue behind it. The result is
+    left next to the lock for ``result_ttl`` seconds and a process that got
+    the lock late returns it instead of calling ``fn`` again. Only results
+    for which ``shareable(value)`` is true are written, and they must be JSON
+    serialisable.
+    """
+
+    def __init__(self, lock_dir: Optional[str] = None, result_ttl: float = 10.0, lock_timeout: float = 60.0):
+        self.lock_dir = lock_dir if (lock_dir and fcntl is not None) else None
+        self.result_ttl = result_ttl
+        self.lock_timeout = lock_timeout
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.calls = 0
+        self.shared = 0
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+
+    def do(self, key: str, fn: Callable[[], Any], shareable: Callable[[Any], bool] = bool) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            if self.lock_dir:
+                call.value = self._do_locked(key, fn, shareable)
+            else:
+                call.value = fn()
+            return call.value
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'calls': self.calls, 'shared': self.shared, 'in_flight': len(self._calls)}
+
+    def _do_locked(self, key: str, fn: Callable[[], Any], shareable: Callable[[Any], bool]) -> Any:
+        base = os.path.join(self.lock_dir, hashlib.sha256(key.encode('utf-8')).hexdigest())
+        with open(base + '.lock', 'a+') as lock_file:
+            locked = self._acquire(lock_file)
+            try:
+                value = self._read_result(base + '.json')
+                if value is not None:
+                    with self._lock:
+                        self.shared += 1
+                    return value
+                value = fn()
+                if shareable(value):
+                    self._write_result(base + '.json', value)
+                return value
+            finally:
+                if locked:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _acquire(self, lock_file) -> bool:
+        # flock has no timeout; poll so a stuck leader cannot block us forever
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.05)
+
+    def _read_result(self, path: str) -> Any:
+        try:
+            if time.time() - os.path.getmtime(path) > self.result_ttl:
+                return None
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)['value']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_result(self, path: str, value: Any) -> None:
+        tmp = f'{path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'value': value}, f)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f'Single-flight result write failed: {e}')
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
@@ -75,7 +75,7 @@ export class GameApi {
     fetch(`${window.API_BASE}/api/v1/generate-crossword`, {
       method: "POST",
       headers,
-      body: JSON.stringify({ topic, difficulty: mapped }),
+      body: JSON.stringify({ topic, difficulty: mapped, format: "sparse" }),
     })
       .then((r) => {
         // Handle non-JSON responses
@@ -146,7 +146,12 @@ export class GameApi {
         }
 
         console.log("API response received, data:", data);
-        const normalized = GridUtils.normalizeGrid(data.grid || []);
+        const sourceGrid =
+          data.grid ||
+          (data.format === "sparse"
+            ? GridUtils.buildGrid(data.words, data.rows || 0, data.cols || 0)
+            : []);
+        const normalized = GridUtils.normalizeGrid(sourceGrid);
         console.log("Normalized grid:", normalized);
         this.game.solutionGrid = normalized.grid;
         this.game.gridSize =
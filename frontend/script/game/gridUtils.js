@@ -1,5 +1,20 @@
 // Grid normalization and utility functions
 export class GridUtils {
+    // Rebuild a solution grid from word coordinates (used by the 'sparse' API format)
+    static buildGrid(words, rows, cols) {
+        const grid = Array.from({ length: rows }, () => new Array(cols).fill(''));
+        (words || []).forEach((item) => {
+            const word = (item.word || '').toUpperCase();
+            const across = (item.direction || '').toString().toLowerCase() === 'across';
+            for (let i = 0; i < word.length; i++) {
+                const r = (item.row ?? 0) + (across ? 0 : i);
+                const c = (item.col ?? 0) + (across ? i : 0);
+                if (grid[r] && c < cols) grid[r][c] = word[i];
+            }
+        });
+        return grid;
+    }
+
     static normalizeGrid(grid) {
         if (!grid || !grid.length || !grid[0]) {
             return { grid: [], size: 0, offset: { row: 0, col: 0 } };